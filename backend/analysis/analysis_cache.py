@@ -0,0 +1,78 @@
+import os
+import re
+import json
+import hashlib
+import threading
+import psycopg2
+
+WHITESPACE = re.compile(r'\s+')
+
+
+def cache_key(text, model, prompt_version):
+    """Hash of the whitespace-normalized text plus everything that changes the model's answer."""
+    normalized = WHITESPACE.sub(' ', text or '').strip()
+    payload = f"{model}\x00{prompt_version}\x00{normalized}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Persistent ToneAnalyzer result cache in the analysis_cache table.
+    Keeps its own autocommit connection so lookups can run from worker
+    threads while the batch connection is mid-transaction.
+    """
+
+    def __init__(self, db_url=None, max_entries=None, max_age_days=None):
+        self.conn = psycopg2.connect(db_url or os.getenv("DATABASE_URL"))
+        self.conn.autocommit = True
+        self.lock = threading.Lock()
+        self.max_entries = max_entries or int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", 50000))
+        self.max_age_days = max_age_days or int(os.getenv("ANALYSIS_CACHE_MAX_AGE_DAYS", 180))
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            with self.conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE analysis_cache SET last_used_at = now()
+                    WHERE cache_key = %s
+                    RETURNING result;
+                """, (key,))
+                row = cur.fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0] if isinstance(row[0], dict) else json.loads(row[0])
+
+    def put(self, key, model, prompt_version, result):
+        with self.lock:
+            with self.conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO analysis_cache (cache_key, model, prompt_version, result)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (cache_key) DO UPDATE
+                    SET result = EXCLUDED.result, last_used_at = now();
+                """, (key, model, prompt_version, json.dumps(result)))
+
+    def evict(self):
+        """Drops entries unused for max_age_days, then the least recently used beyond max_entries."""
+        with self.lock:
+            with self.conn.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM analysis_cache WHERE last_used_at < now() - make_interval(days => %s);",
+                    (self.max_age_days,),
+                )
+                expired = cur.rowcount
+                cur.execute("""
+                    DELETE FROM analysis_cache WHERE cache_key IN (
+                        SELECT cache_key FROM analysis_cache
+                        ORDER BY last_used_at DESC
+                        OFFSET %s
+                    );
+                """, (self.max_entries,))
+                return expired + cur.rowcount
+
+    def close(self):
+        self.conn.close()
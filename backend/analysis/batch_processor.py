@@ -1,61 +1,167 @@
 import os
+import sys
+import socket
+import asyncio
 import psycopg2
 from dotenv import load_dotenv
 from sentiment_eng import ToneAnalyzer
+from scoring_engine import ScoringEngine
+from analysis_cache import AnalysisCache
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rollups import refresh_rollups, ensure_rollups
 
 load_dotenv()
 
+BATCH_SIZE = int(os.getenv("SCORING_BATCH_SIZE", 50))
+MAX_ATTEMPTS = int(os.getenv("SCORING_MAX_ATTEMPTS", 3))
+LEASE_MINUTES = int(os.getenv("SCORING_LEASE_MINUTES", 30))
+RETRY_DELAY_MINUTES = int(os.getenv("SCORING_RETRY_DELAY_MINUTES", 60))
+WORKER = os.getenv("SCORING_WORKER") or f"{socket.gethostname()}-{os.getpid()}"
+
+def enqueue_new(cur):
+    # Queues transcripts that have no queue row yet; ones scored before the queue existed go straight to done
+    cur.execute("""
+        INSERT INTO scoring_queue (transcript_id, status)
+        SELECT t.id,
+               CASE WHEN EXISTS (SELECT 1 FROM transcript_sentences s WHERE s.transcript_id = t.id)
+                    THEN 'done' ELSE 'pending' END
+        FROM transcripts t
+        WHERE NOT EXISTS (SELECT 1 FROM scoring_queue q WHERE q.transcript_id = t.id)
+        ON CONFLICT (transcript_id) DO NOTHING;
+    """)
+    return cur.rowcount
+
+def claim_batch(cur):
+    """
+    Leases up to BATCH_SIZE claimable transcripts for this worker. SKIP LOCKED
+    lets parallel workers take disjoint batches; a lease that runs out (crashed
+    worker) makes the row claimable again until MAX_ATTEMPTS is reached.
+    """
+    cur.execute("""
+        UPDATE scoring_queue
+        SET status = 'failed', leased_until = NULL, last_error = COALESCE(last_error, 'lease expired'), updated_at = now()
+        WHERE status = 'running' AND leased_until < now() AND attempts >= %s;
+    """, (MAX_ATTEMPTS,))
+
+    cur.execute("""
+        UPDATE scoring_queue q
+        SET status = 'running', attempts = q.attempts + 1, worker = %s,
+            leased_until = now() + %s * interval '1 minute', updated_at = now()
+        FROM transcripts t
+        WHERE t.id = q.transcript_id AND q.transcript_id IN (
+            SELECT transcript_id FROM scoring_queue
+            WHERE status IN ('pending', 'running')
+              AND (leased_until IS NULL OR leased_until < now())
+              AND attempts < %s
+            ORDER BY enqueued_at, transcript_id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING q.transcript_id, t.content;
+    """, (WORKER, LEASE_MINUTES, MAX_ATTEMPTS, BATCH_SIZE))
+    return cur.fetchall()
+
+def held_leases(cur, transcript_ids):
+    """The subset of transcript_ids this worker still holds; a lease that expired mid-batch may belong to another worker now."""
+    cur.execute("""
+        SELECT transcript_id FROM scoring_queue
+        WHERE transcript_id = ANY(%s) AND status = 'running' AND worker = %s
+        FOR UPDATE;
+    """, (list(transcript_ids), WORKER))
+    return {row[0] for row in cur.fetchall()}
+
+def mark_done(cur, transcript_ids):
+    cur.execute("""
+        UPDATE scoring_queue
+        SET status = 'done', leased_until = NULL, last_error = NULL, updated_at = now()
+        WHERE transcript_id = ANY(%s);
+    """, (list(transcript_ids),))
+
+def mark_failed(cur, transcript_id, error):
+    # Back off exponentially between attempts; give up for good after MAX_ATTEMPTS
+    cur.execute("""
+        UPDATE scoring_queue
+        SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+            leased_until = CASE WHEN attempts >= %s THEN NULL
+                                ELSE now() + %s * interval '1 minute' * power(2, attempts - 1) END,
+            last_error = %s, updated_at = now()
+        WHERE transcript_id = %s;
+    """, (MAX_ATTEMPTS, MAX_ATTEMPTS, RETRY_DELAY_MINUTES, error, transcript_id))
+
+def insert_sentences(cur, p_id, analysis_result):
+    insert_sql = """
+        INSERT INTO transcript_sentences
+        (transcript_id, sentence_text, topic, stance_score, impact_weight, reasoning)
+        VALUES (%s, %s, %s, %s, %s, %s);
+    """
+
+    sentence_data = [
+        (p_id, s.text, s.topic, s.score, s.weight, s.reasoning)
+        for s in analysis_result.sentences
+    ]
+
+    cur.executemany(insert_sql, sentence_data)
+    print(f"Successfully inserted {len(sentence_data)} sentences for ID {p_id}")
+
+async def drain_backlog(connection, engine):
+    with connection.cursor() as cur:
+        ensure_rollups(cur)
+        queued = enqueue_new(cur)
+    connection.commit()
+    if queued:
+        print(f"Queued {queued} new transcripts")
+
+    while True:
+        with connection.cursor() as cur:
+            paragraphs = claim_batch(cur)
+        connection.commit()
+
+        if not paragraphs:
+            print("No transcripts left to process!")
+            return
+
+        print(f"Processing {len(paragraphs)} transcripts")
+        results = await engine.score_batch(paragraphs)
+
+        # Each batch commits on its own so a crash mid-backfill keeps earlier work
+        with connection:
+            with connection.cursor() as cur:
+                held = held_leases(cur, [p_id for p_id, _ in results])
+                scored_ids = []
+                for p_id, analysis_result in results:
+                    if p_id not in held:
+                        print(f"Lease on transcript ID {p_id} was lost, discarding its result")
+                        continue
+                    if not analysis_result or not analysis_result.sentences:
+                        mark_failed(cur, p_id, engine.errors.pop(p_id, "no sentences scored"))
+                        continue
+
+                    insert_sentences(cur, p_id, analysis_result)
+                    scored_ids.append(p_id)
+
+                mark_done(cur, scored_ids)
+                # Only the newly scored transcripts and their dates need recomputing
+                refresh_rollups(cur, scored_ids)
+
 def process_transcript_sentences():
-    analyzer = ToneAnalyzer()
     try:
         connection = psycopg2.connect(os.getenv("DATABASE_URL"))
+        cache = AnalysisCache()
     except Exception as e:
         print(f"Database connection failed: {e}")
         return
 
+    engine = ScoringEngine(ToneAnalyzer(cache=cache))
     try:
-        with connection:
-            with connection.cursor() as cur:
-                fetch_query = """
-                    SELECT t.id, t.content
-                    FROM transcripts t
-                    LEFT JOIN transcript_sentences s ON t.id = s.transcript_id
-                    WHERE s.id IS NULL
-                    LIMIT 20;
-                """
-                cur.execute(fetch_query)
-                paragraphs = cur.fetchall()
-
-                if not paragraphs:
-                    print("No transcripts left to process!")
-                    return
-
-                for p_id, content in paragraphs:
-                    print(f"Processing transcript ID: {p_id}")
-                    
-                    analysis_result = analyzer.analyze_paragraph(content)
-                    
-                    if not analysis_result or not analysis_result.sentences:
-                        continue
-
-                    insert_sql = """
-                        INSERT INTO transcript_sentences 
-                        (transcript_id, sentence_text, topic, stance_score, impact_weight, reasoning)
-                        VALUES (%s, %s, %s, %s, %s, %s);
-                    """
-                    
-                    sentence_data = [
-                        (p_id, s.text, s.topic, s.score, s.weight, s.reasoning)
-                        for s in analysis_result.sentences
-                    ]
-                    
-                    cur.executemany(insert_sql, sentence_data)
-                    print(f"Successfully inserted {len(sentence_data)} sentences for ID {p_id}")
-
+        asyncio.run(drain_backlog(connection, engine))
+        print(f"Evicted {cache.evict()} stale analysis cache entries")
     except Exception as e:
         print(f"An error occurred during processing: {e}")
     finally:
         connection.close()
+        cache.close()
+        engine.report()
 
 if __name__ == "__main__":
-    process_transcript_sentences()
\ No newline at end of file
+    process_transcript_sentences()
@@ -0,0 +1,64 @@
+import os
+import re
+from typing import List
+
+MAX_WINDOW_CHARS = int(os.getenv("SCORING_WINDOW_CHARS", 4000))
+MAX_WINDOW_SENTENCES = int(os.getenv("SCORING_WINDOW_SENTENCES", 25))
+
+# Common abbreviations in policy statements that end with a period but not a sentence
+ABBREVIATIONS = {'u.s', 'e.g', 'i.e', 'mr', 'ms', 'dr', 'no', 'vs', 'st', 'jan', 'feb', 'mar', 'apr',
+                 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec', 'approx', 'etc'}
+
+SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]?\s+(?=["\'(\[]?[A-Z0-9])')
+
+
+def split_long(sentence: str, max_chars: int) -> List[str]:
+    """Hard-splits run-on text (tables, PDF artifacts) at word boundaries."""
+    pieces, current = [], ''
+    for word in sentence.split(' '):
+        if current and len(current) + len(word) + 1 > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_sentences(text: str, max_chars: int = MAX_WINDOW_CHARS) -> List[str]:
+    text = re.sub(r'\s+', ' ', text or '').strip()
+    if not text:
+        return []
+
+    sentences, start = [], 0
+    for match in SENTENCE_END.finditer(text):
+        candidate = text[start:match.start()].strip()
+        last_word = candidate.rsplit(' ', 1)[-1].rstrip('.').lower()
+        if last_word in ABBREVIATIONS:
+            continue
+        sentences.append(candidate)
+        start = match.end()
+    sentences.append(text[start:].strip())
+
+    result = []
+    for sentence in sentences:
+        if not sentence:
+            continue
+        result.extend(split_long(sentence, max_chars) if len(sentence) > max_chars else [sentence])
+    return result
+
+
+def make_windows(sentences: List[str], max_chars: int = MAX_WINDOW_CHARS,
+                 max_sentences: int = MAX_WINDOW_SENTENCES) -> List[List[str]]:
+    """Groups consecutive sentences into windows bounded by size and count, preserving order."""
+    windows, current, size = [], [], 0
+    for sentence in sentences:
+        if current and (size + len(sentence) > max_chars or len(current) >= max_sentences):
+            windows.append(current)
+            current, size = [], 0
+        current.append(sentence)
+        size += len(sentence)
+    if current:
+        windows.append(current)
+    return windows
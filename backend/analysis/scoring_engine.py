@@ -0,0 +1,158 @@
+import os
+import time
+import random
+import asyncio
+from collections import deque
+import openai
+from sentiment_eng import combine_windows, IncompleteWindowError
+
+# Errors worth retrying; anything else (bad request, parse failure) fails the transcript.
+# A window the model only partly scored usually comes back whole on a second sample.
+RETRYABLE_ERRORS = (
+    IncompleteWindowError,
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+
+class RateLimiter:
+    """
+    Sliding one-minute window over requests and tokens. Token usage is
+    reserved up front from an estimate and corrected once the API reports
+    what the call actually cost.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.rpm = requests_per_minute
+        self.tpm = tokens_per_minute
+        self.window = deque()  # [timestamp, tokens] per request
+        self.lock = asyncio.Lock()
+
+    def _prune(self, now):
+        while self.window and now - self.window[0][0] >= 60:
+            self.window.popleft()
+
+    async def acquire(self, estimated_tokens):
+        # A single request larger than the whole budget would never fit
+        estimated_tokens = min(estimated_tokens, self.tpm)
+        while True:
+            async with self.lock:
+                now = time.monotonic()
+                self._prune(now)
+                used = sum(tokens for _, tokens in self.window)
+                if len(self.window) < self.rpm and used + estimated_tokens <= self.tpm:
+                    entry = [now, estimated_tokens]
+                    self.window.append(entry)
+                    return entry
+                wait = 60 - (now - self.window[0][0]) if self.window else 0.1
+            await asyncio.sleep(max(wait, 0.05))
+
+    def settle(self, entry, actual_tokens):
+        entry[1] = actual_tokens
+
+
+class ScoringEngine:
+    """
+    Scores transcripts concurrently under a concurrency cap and a per-minute
+    budget. Each transcript is split into sentence windows, and the window
+    is the unit of caching, rate limiting and retries.
+    """
+
+    def __init__(self, analyzer, concurrency=None, requests_per_minute=None,
+                 tokens_per_minute=None, max_retries=None, base_delay=1.0):
+        self.analyzer = analyzer
+        self.concurrency = concurrency or int(os.getenv("SCORING_CONCURRENCY", 8))
+        self.limiter = RateLimiter(
+            requests_per_minute or int(os.getenv("OPENAI_RPM", 500)),
+            tokens_per_minute or int(os.getenv("OPENAI_TPM", 200000)),
+        )
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("SCORING_MAX_RETRIES", 5))
+        self.base_delay = base_delay
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+
+        self.started = time.monotonic()
+        self.scored = 0
+        self.windows = 0
+        self.cache_hits = 0
+        self.failed = 0
+        self.tokens = 0
+        # Last error per transcript, for the caller to record
+        self.errors = {}
+
+    @staticmethod
+    def estimate_tokens(sentences):
+        # ~4 chars per token for the prompt, plus a short scored entry per sentence in the output
+        return sum(len(s) for s in sentences) // 4 + 60 * len(sentences) + 600
+
+    def backoff_delay(self, attempt, error):
+        retry_after = None
+        response = getattr(error, 'response', None)
+        if response is not None:
+            retry_after = response.headers.get('retry-after')
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.base_delay * (2 ** attempt) + random.uniform(0, self.base_delay)
+
+    async def score_window(self, transcript_id, sentences):
+        """Returns the ParagraphAnalysis for one window of a transcript, or None if it could not be scored."""
+        async with self.semaphore:
+            hit = await asyncio.to_thread(self.analyzer.cached, sentences)
+            if hit is not None:
+                self.cache_hits += 1
+                return hit
+
+            for attempt in range(self.max_retries + 1):
+                entry = await self.limiter.acquire(self.estimate_tokens(sentences))
+                try:
+                    result, tokens = await self.analyzer.analyze_window_async(sentences)
+                except RETRYABLE_ERRORS as e:
+                    self.limiter.settle(entry, 0)
+                    if attempt == self.max_retries:
+                        print(f"Giving up on a window of transcript ID {transcript_id}: {e}")
+                        self.errors[transcript_id] = f"{type(e).__name__}: {e}"
+                        return None
+                    delay = self.backoff_delay(attempt, e)
+                    print(f"Retrying transcript ID {transcript_id} in {delay:.1f}s ({type(e).__name__})")
+                    await asyncio.sleep(delay)
+                    continue
+                except Exception as e:
+                    self.limiter.settle(entry, 0)
+                    print(f"Error scoring transcript ID {transcript_id}: {e}")
+                    self.errors[transcript_id] = f"{type(e).__name__}: {e}"
+                    return None
+
+                self.limiter.settle(entry, tokens)
+                self.tokens += tokens
+                return result
+        return None
+
+    async def score(self, transcript_id, content):
+        """Scores all windows of one transcript in parallel and merges them back in order."""
+        windows = self.analyzer.windows(content)
+        self.windows += len(windows)
+        results = await asyncio.gather(*(self.score_window(transcript_id, w) for w in windows))
+
+        result = combine_windows(results)
+        if result is None:
+            self.failed += 1
+        else:
+            self.scored += 1
+        return result
+
+    async def score_batch(self, rows):
+        """Scores (transcript_id, content) rows concurrently, returning (transcript_id, result) pairs in order."""
+        results = await asyncio.gather(*(self.score(t_id, content) for t_id, content in rows))
+        return list(zip((t_id for t_id, _ in rows), results))
+
+    def report(self):
+        minutes = max(time.monotonic() - self.started, 1e-9) / 60
+        print(
+            f"Scored {self.scored} transcripts ({self.failed} failed) over {self.windows} windows "
+            f"({self.cache_hits} from cache) in {minutes:.2f} min: "
+            f"{self.scored / minutes:.1f} transcripts/min, {self.tokens / minutes:.0f} tokens/min"
+        )
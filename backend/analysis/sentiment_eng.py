@@ -1,8 +1,12 @@
 import os
-from typing import List
-from openai import OpenAI
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+from openai import OpenAI, AsyncOpenAI
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
+from analysis_cache import cache_key
+from chunking import split_sentences, make_windows
 
 load_dotenv()
 
@@ -16,14 +20,41 @@ class SentenceAnalysis(BaseModel):
 class ParagraphAnalysis(BaseModel):
     sentences: List[SentenceAnalysis]
 
+# What the model actually returns: scores by sentence index, without echoing the text back
+class SentenceScore(BaseModel):
+    index: int = Field(description="Index of the sentence in the numbered list")
+    topic: str = Field(description="Primary topic: Inflation, Growth, Employment, Guidance, or Boilerplate")
+    score: float = Field(description="Hawkish/Dovish score (-1.0 to 1.0)")
+    weight: float = Field(description="Importance weight from 0.0 to 1.0 based on market impact")
+    reasoning: str = Field(description="Brief logic for the classification")
+
+class WindowAnalysis(BaseModel):
+    scores: List[SentenceScore]
+
+class IncompleteWindowError(ValueError):
+    """The model skipped sentences of a window; a partial window must never be stored or cached."""
+
+# Bump whenever the prompt or response schema changes so cached results are not reused
+PROMPT_VERSION = "2"
+
+SYSTEM_PROMPT = "You are a high-precision macro sentiment engine. You do not use rounded numbers, you provide justified scores."
+
 class ToneAnalyzer:
-    def __init__(self):
+    def __init__(self, cache=None):
+        self.cache = cache
         self.client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+        # Retries are left to the caller (see scoring_engine.py) so backoff is scheduled in one place
+        self.async_client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"), max_retries=0)
         self.model = "gpt-4o-mini"
+        self.max_workers = int(os.getenv("SCORING_CONCURRENCY", 8))
 
-    def analyze_paragraph(self, text: str) -> ParagraphAnalysis:
+    def windows(self, text: str) -> List[List[str]]:
+        return make_windows(split_sentences(text))
+
+    def build_messages(self, sentences: List[str]):
+        numbered = "\n".join(f"[{i}] {sentence}" for i, sentence in enumerate(sentences))
         prompt = f"""
-        Analyze this central bank paragraph sentence-by-sentence as a Senior Macro Quant.
+        Analyze these central bank sentences one-by-one as a Senior Macro Quant.
         
         1. Assign weights:
         - 1.0: Interest Rate Guidance & Inflation (Critical)
@@ -45,18 +76,103 @@ class ToneAnalyzer:
         - Modality: How certain is the bank? (e.g., 'might' vs 'will')
         - Intensity of adverbs: How fast or strong is the move? (e.g., 'gradually' vs 'rapidly')
         
-        Paragraph: {text}
+        Return exactly one entry per sentence, identified by its [index]. Do not repeat the sentence text.
+        
+        Sentences:
+        {numbered}
+        """
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+
+    @staticmethod
+    def merge_window(sentences: List[str], window: WindowAnalysis) -> ParagraphAnalysis:
+        """
+        Joins index-keyed scores back onto the locally held sentence text, in
+        order. Raises IncompleteWindowError unless every sentence got a score.
         """
+        by_index = {}
+        for s in window.scores if window else []:
+            if 0 <= s.index < len(sentences):
+                by_index.setdefault(s.index, s)
+        if len(by_index) != len(sentences):
+            raise IncompleteWindowError(f"model scored {len(by_index)} of {len(sentences)} sentences")
+        return ParagraphAnalysis(sentences=[
+            SentenceAnalysis(text=sentences[i], topic=s.topic, score=s.score, weight=s.weight, reasoning=s.reasoning)
+            for i, s in sorted(by_index.items())
+        ])
+
+    def cache_key(self, sentences: List[str]) -> str:
+        return cache_key(" ".join(sentences), self.model, PROMPT_VERSION)
+
+    def cached(self, sentences: List[str]) -> Optional[ParagraphAnalysis]:
+        if self.cache is None:
+            return None
+        try:
+            hit = self.cache.get(self.cache_key(sentences))
+            if not hit:
+                return None
+            result = ParagraphAnalysis.model_validate(hit)
+            # Entries written before partial windows were rejected may be short
+            return result if len(result.sentences) == len(sentences) else None
+        except Exception as e:
+            print(f"Cache read error: {e}")
+            return None
+
+    def store(self, sentences: List[str], result: ParagraphAnalysis):
+        if self.cache is None or result is None or len(result.sentences) != len(sentences):
+            return
+        try:
+            self.cache.put(self.cache_key(sentences), self.model, PROMPT_VERSION, result.model_dump())
+        except Exception as e:
+            print(f"Cache write error: {e}")
+
+    def analyze_window(self, sentences: List[str]) -> Optional[ParagraphAnalysis]:
+        hit = self.cached(sentences)
+        if hit is not None:
+            return hit
         try:
             completion = self.client.beta.chat.completions.parse(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a high-precision macro sentiment engine. You do not use rounded numbers, you provide justified scores."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format=ParagraphAnalysis,
+                messages=self.build_messages(sentences),
+                response_format=WindowAnalysis,
             )
-            return completion.choices[0].message.parsed
+            result = self.merge_window(sentences, completion.choices[0].message.parsed)
+            self.store(sentences, result)
+            return result
         except Exception as e:
             print(f"Error: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def analyze_paragraph(self, text: str) -> Optional[ParagraphAnalysis]:
+        """Scores every window of the transcript in parallel. Returns None if any window fails."""
+        windows = self.windows(text)
+        if not windows:
+            return None
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(windows))) as pool:
+            results = list(pool.map(self.analyze_window, windows))
+        return combine_windows(results)
+
+    async def analyze_window_async(self, sentences: List[str]) -> Tuple[ParagraphAnalysis, int]:
+        """
+        Async variant used by the scoring engine. Returns the merged analysis
+        and the total tokens billed. API errors are raised, not swallowed, so
+        the caller can back off on rate limits. Cache lookups are left to the
+        caller so hits never consume rate-limit budget.
+        """
+        completion = await self.async_client.beta.chat.completions.parse(
+            model=self.model,
+            messages=self.build_messages(sentences),
+            response_format=WindowAnalysis,
+        )
+        tokens = completion.usage.total_tokens if completion.usage else 0
+        result = self.merge_window(sentences, completion.choices[0].message.parsed)
+        await asyncio.to_thread(self.store, sentences, result)
+        return result, tokens
+
+def combine_windows(results: List[Optional[ParagraphAnalysis]]) -> Optional[ParagraphAnalysis]:
+    # A partially scored transcript would never be picked up again, so all windows must succeed
+    if not results or any(r is None for r in results):
+        return None
+    return ParagraphAnalysis(sentences=[s for r in results for s in r.sentences])
@@ -0,0 +1,98 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Fewer overlapping observations than this and a correlation is reported as null
+MIN_PERIODS = 10
+
+
+def rolling_stats(values, window):
+    """Trailing mean and population std over `window` days, NaN until the window fills."""
+    mean = np.full(len(values), np.nan)
+    std = np.full(len(values), np.nan)
+    if window <= len(values):
+        windows = sliding_window_view(values, window)
+        mean[window - 1:] = windows.mean(axis=1)
+        std[window - 1:] = windows.std(axis=1)
+    return mean, std
+
+
+def zscores(values, mean, std):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(std > 0, (values - mean) / std, np.nan)
+
+
+def bar_returns(days, price_days, prices):
+    """Daily log return on each day that has a price bar (vs the previous bar), NaN on every other day."""
+    returns = np.full(len(days), np.nan)
+    if len(price_days) < 2:
+        return returns
+    changes = np.diff(np.log(prices))
+    idx = np.searchsorted(days, price_days[1:])
+    hit = idx < len(days)
+    hit[hit] &= days[idx[hit]] == price_days[1:][hit]
+    returns[idx[hit]] = changes[hit]
+    return returns
+
+
+def lag_correlations(x, y, max_lag):
+    """
+    Pearson correlation of x[t] with y[t + lag] for every lag in 0..max_lag
+    at once. Row `lag` of a strided view over the NaN-padded y is y shifted
+    by that lag, so the whole scan is a handful of (max_lag + 1, n) array ops.
+    Pairs with a NaN on either side are dropped. Returns (correlation, count).
+    """
+    n = len(x)
+    if n == 0:
+        return np.full(max_lag + 1, np.nan), np.zeros(max_lag + 1, dtype=int)
+
+    shifted = sliding_window_view(np.concatenate([y, np.full(max_lag, np.nan)]), n)[:max_lag + 1]
+    valid = ~np.isnan(shifted) & ~np.isnan(x)[None, :]
+    counts = valid.sum(axis=1)
+
+    xs = np.where(valid, x[None, :], 0.0)
+    ys = np.where(valid, shifted, 0.0)
+    safe_counts = np.maximum(counts, 1)[:, None]
+    dx = np.where(valid, xs - xs.sum(axis=1, keepdims=True) / safe_counts, 0.0)
+    dy = np.where(valid, ys - ys.sum(axis=1, keepdims=True) / safe_counts, 0.0)
+
+    denom = np.sqrt((dx * dx).sum(axis=1) * (dy * dy).sum(axis=1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = np.where((counts >= MIN_PERIODS) & (denom > 0), (dx * dy).sum(axis=1) / denom, np.nan)
+    return corr, counts
+
+
+def analyze(days, divergence, price_days, prices, window=30, max_lag=60):
+    """
+    Summary statistics, rolling volatility / z-scores of the divergence, and
+    its cross-correlation with USD/CAD log returns `lag` days later.
+    """
+    divergence = np.asarray(divergence, dtype=float)
+    mean, std = rolling_stats(divergence, window)
+    corr, counts = lag_correlations(divergence, bar_returns(days, price_days, prices), max_lag)
+
+    best = None
+    if not np.isnan(corr).all():
+        lag = int(np.nanargmax(np.abs(corr)))
+        best = {'lag': lag, 'correlation': round(float(corr[lag]), 4), 'count': int(counts[lag])}
+
+    return {
+        'summary': {
+            'days': int(len(days)),
+            'current': round(float(divergence[-1]), 4) if len(divergence) else 0.0,
+            'mean': round(float(divergence.mean()), 4) if len(divergence) else 0.0,
+            'volatility': round(float(divergence.std()), 4) if len(divergence) else 0.0,
+            'window': window,
+            'best_lag': best,
+        },
+        'rolling': {
+            'date': np.datetime_as_string(days, unit='D').tolist(),
+            'divergence': np.round(divergence, 4),
+            'volatility': np.round(std, 4),
+            'zscore': np.round(zscores(divergence, mean, std), 4),
+        },
+        'lags': {
+            'lag': np.arange(max_lag + 1),
+            'correlation': np.round(corr, 4),
+            'count': counts,
+        },
+    }
@@ -0,0 +1,115 @@
+import time
+import socket
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from common import bench_db_url, latency_summary
+
+ENDPOINTS = [
+    "/api/divergence",
+    "/api/divergence?mode=impact",
+    "/api/divergence?mode=decay&half_life=45",
+    "/api/divergence?format=columnar",
+    "/api/usdcad",
+    "/api/dashboard",
+    "/api/dashboard?start=2020-01-01&max_points=1000",
+    "/api/analytics",
+    "/api/analytics?range=1y&window=60",
+    "/api/regimes",
+    "/api/transcripts",
+    "/api/transcripts?bank=Fed&limit=200",
+    "/api/transcripts/{transcript_id}/sentences",
+    "/api/sentences?ids={transcript_id}&ids=1&ids=2&ids=3&ids=4&ids=5",
+    "/api/search?q=inflation",
+    "/api/search?q=labour market&bank=BoC&topic=Inflation&min_score=0.3",
+    "/api/search?q=inflation&scope=transcripts",
+    "/api/pool",
+]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port):
+    """Runs the real app under uvicorn in a background thread, with yfinance mocked out."""
+    import uvicorn
+    import fx_store
+    from mocks import MockYFinance
+    fx_store.yf = MockYFinance
+
+    import main
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def load(base_url, path, concurrency, requests_per_worker):
+    local = threading.local()
+
+    def worker(_):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        samples, errors = [], 0
+        for _ in range(requests_per_worker):
+            start = time.perf_counter()
+            try:
+                r = session.get(base_url + path, timeout=60)
+                if r.status_code != 200:
+                    errors += 1
+            except Exception:
+                errors += 1
+            samples.append(time.perf_counter() - start)
+        return samples, errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    samples = [s for r, _ in results for s in r]
+    summary = latency_summary(samples, elapsed)
+    summary['errors'] = sum(e for _, e in results)
+    return summary
+
+
+def run(concurrency=16, requests_per_worker=25):
+    bench_db_url()
+    port = free_port()
+    server, thread = start_server(port)
+    base_url = f"http://127.0.0.1:{port}"
+
+    try:
+        transcripts = requests.get(base_url + "/api/transcripts?limit=1", timeout=60).json()
+        transcript_id = transcripts[0]['id'] if transcripts else 1
+
+        results = {}
+        for template in ENDPOINTS:
+            path = template.format(transcript_id=transcript_id)
+
+            # First hit pays for cold caches; report it separately from the steady state
+            start = time.perf_counter()
+            cold = requests.get(base_url + path, timeout=120)
+            cold_ms = round((time.perf_counter() - start) * 1000, 3)
+
+            summary = load(base_url, path, concurrency, requests_per_worker)
+            summary['cold_ms'] = cold_ms
+            summary['response_bytes'] = len(cold.content)
+            results[template] = summary
+            print(f"{template}: p50 {summary.get('p50_ms')} ms, p99 {summary.get('p99_ms')} ms, "
+                  f"{summary.get('throughput_rps')} req/s")
+        return {'concurrency': concurrency, 'requests_per_worker': requests_per_worker, 'endpoints': results}
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps(run(), indent=2))
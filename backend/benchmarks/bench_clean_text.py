@@ -0,0 +1,105 @@
+import re
+import time
+import random
+import argparse
+import unicodedata
+import common  # noqa: F401 (sets up the backend import paths)
+from base_scraper import clean_text, clean_texts
+
+# Checks that the single-pass clean_text produces exactly the same output as
+# the original five-pass version, then times both over a synthetic archive.
+#   python bench_clean_text.py --docs 2000 --fuzz 200000
+
+
+def clean_text_reference(text):
+    """The original multi-pass implementation, kept verbatim as the oracle."""
+    if not text:
+        return ""
+
+    text = unicodedata.normalize('NFKC', text)
+    text = re.sub(r'[\x00-\x1F\x7F-\x9F]', ' ', text)
+    text = text.replace('\xa0', ' ').replace('\u200b', ' ')
+    text = re.sub(r'[-–—]{2,}', ' ', text)
+    text = re.sub(r'[_*#]{2,}', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+
+    return text.strip()
+
+
+# Characters the rules treat specially, plus ones NFKC rewrites into them
+# (full-width/small forms, ligatures, en-quad spaces, compatibility dashes)
+TRICKY = list(
+    " \t\n\r\x0b\x0c\x00\x1f\x7f\x85\x9f\xa0\u200b\u2000\u2009\u3000\u2028"
+    "-–—_*#﹣－﹘＿＊＃‒–—"
+    "ﬁΩ½́ẛéeaZ0.,"
+)
+
+PARAGRAPH = (
+    "The Committee decided to maintain the target range for the federal funds rate at 5¼ to 5½ percent. "
+    "Inflation has eased over the past year but remains elevated — the Committee is highly attentive "
+    "to inflation risks.\n\n---\n\n**Projections**\t## Core PCE   "
+)
+
+
+def fuzz(cases, seed=0):
+    rng = random.Random(seed)
+    for _ in range(cases):
+        text = "".join(rng.choice(TRICKY) for _ in range(rng.randint(0, 24)))
+        expected, actual = clean_text_reference(text), clean_text(text)
+        if expected != actual:
+            raise SystemExit(f"Mismatch for {text!r}: expected {expected!r}, got {actual!r}")
+    print(f"Fuzz: {cases} random strings identical")
+
+
+def codepoints():
+    """Every code point on its own and doubled between words, which covers each NFKC/whitespace mapping."""
+    for cp in range(0x110000):
+        if 0xD800 <= cp <= 0xDFFF:
+            continue
+        c = chr(cp)
+        for text in (c, f"a{c}{c}b"):
+            if clean_text_reference(text) != clean_text(text):
+                raise SystemExit(f"Mismatch for {text!r}")
+    print("Code points: all identical")
+
+
+def archive(docs, seed=1):
+    """Transcript-sized documents, a third of them pure ASCII as most BoC pages are."""
+    rng = random.Random(seed)
+    ascii_paragraph = PARAGRAPH.encode('ascii', 'ignore').decode()
+    out = []
+    for i in range(docs):
+        base = ascii_paragraph if i % 3 == 0 else PARAGRAPH
+        out.append("".join(base if rng.random() < 0.9 else rng.choice(TRICKY) * 3 for _ in range(rng.randint(50, 200))))
+    return out
+
+
+def timed(fn, texts):
+    start = time.perf_counter()
+    result = list(fn(texts))
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Equivalence check and micro-benchmark for clean_text")
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--fuzz", type=int, default=100000)
+    args = parser.parse_args()
+
+    codepoints()
+    fuzz(args.fuzz)
+
+    texts = archive(args.docs)
+    megabytes = sum(len(t.encode('utf-8')) for t in texts) / 1e6
+    old_time, old = timed(lambda ts: map(clean_text_reference, ts), texts)
+    new_time, new = timed(clean_texts, texts)
+    if old != new:
+        raise SystemExit("Archive output differs from the reference implementation")
+
+    print(f"Archive: {args.docs} docs, {megabytes:.1f} MB, outputs identical")
+    print(f"  reference: {old_time:.3f}s ({megabytes / old_time:.1f} MB/s)")
+    print(f"  clean_text: {new_time:.3f}s ({megabytes / new_time:.1f} MB/s), {old_time / new_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
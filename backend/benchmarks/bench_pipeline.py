@@ -0,0 +1,90 @@
+import time
+import uuid
+import psycopg2
+from common import FIXTURES_MANIFEST, bench_db_url
+from mocks import MockToneAnalyzer, FixtureSite
+
+
+def count(cur, query):
+    cur.execute(query)
+    return cur.fetchone()[0]
+
+
+def bench_batch_processor(latency=0.2):
+    """Drains the unscored backlog with the real engine and DB writes, and a mocked model call."""
+    import batch_processor
+
+    db_url = bench_db_url()
+    batch_processor.ToneAnalyzer = lambda cache=None: MockToneAnalyzer(cache=cache, latency=latency)
+
+    conn = psycopg2.connect(db_url)
+    try:
+        with conn.cursor() as cur:
+            before = count(cur, "SELECT COUNT(*) FROM transcript_scores")
+        conn.commit()
+
+        start = time.perf_counter()
+        batch_processor.process_transcript_sentences()
+        elapsed = time.perf_counter() - start
+
+        with conn.cursor() as cur:
+            scored = count(cur, "SELECT COUNT(*) FROM transcript_scores") - before
+        conn.commit()
+    finally:
+        conn.close()
+
+    return {
+        'mock_latency_s': latency,
+        'transcripts': scored,
+        'seconds': round(elapsed, 3),
+        'transcripts_per_min': round(scored / (elapsed / 60), 2) if elapsed else 0.0,
+    }
+
+
+def bench_scrapers(articles=50, latency=0.05, manifest=FIXTURES_MANIFEST):
+    """Runs both scrapers in one process against local fixtures instead of the live sites."""
+    import run_scrapers
+    from http_pool import FetchPool
+
+    db_url = bench_db_url()
+    site = FixtureSite(uuid.uuid4().hex[:8], articles=articles, latency=latency)
+    if manifest:
+        site.load_recorded(manifest)
+
+    class FixtureFetchPool(FetchPool):
+        def get(self, url, timeout=15, **kwargs):
+            host = url.split('/')[2]
+            with self._host_slot(host):
+                self._wait_turn(host)
+                return site.get(url)
+
+    run_scrapers.FetchPool = FixtureFetchPool
+
+    conn = psycopg2.connect(db_url)
+    try:
+        with conn.cursor() as cur:
+            before = count(cur, "SELECT COUNT(*) FROM transcripts")
+        conn.commit()
+
+        start = time.perf_counter()
+        run_scrapers.run_all()
+        elapsed = time.perf_counter() - start
+
+        with conn.cursor() as cur:
+            saved = count(cur, "SELECT COUNT(*) FROM transcripts") - before
+        conn.commit()
+    finally:
+        conn.close()
+
+    return {
+        'mock_latency_s': latency,
+        'articles_offered': site.offered,
+        'transcripts': saved,
+        'seconds': round(elapsed, 3),
+        'transcripts_per_min': round(saved / (elapsed / 60), 2) if elapsed else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps({'batch_processor': bench_batch_processor(), 'scrapers': bench_scrapers()}, indent=2))
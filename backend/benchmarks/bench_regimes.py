@@ -0,0 +1,77 @@
+import time
+import argparse
+import numpy as np
+import common  # noqa: F401 (sets up the backend import paths)
+from regimes import pelt, mean_shift_cost, variance_shift_cost
+
+# Checks that the pruned PELT in regimes.py returns exactly the segmentation an
+# exhaustive dynamic program finds, then times it on a ten-year daily series.
+#   python bench_regimes.py --cases 300
+
+
+def exhaustive(cost, n, penalty, min_size):
+    """O(n^2) optimal partitioning with no pruning, as the oracle."""
+    if n < 2 * min_size:
+        return [n]
+    best = np.full(n + 1, np.inf)
+    best[0] = -penalty
+    previous = np.zeros(n + 1, dtype=int)
+    for t in range(min_size, n + 1):
+        starts = np.arange(0, t - min_size + 1)
+        starts = starts[np.isfinite(best[starts])]
+        totals = best[starts] + cost(starts, t) + penalty
+        i = int(np.argmin(totals))
+        best[t], previous[t] = totals[i], starts[i]
+    ends = [n]
+    while previous[ends[-1]] > 0:
+        ends.append(previous[ends[-1]])
+    return ends[::-1]
+
+
+def total_cost(cost, ends, penalty):
+    starts = [0] + ends[:-1]
+    return sum(float(cost(np.array([s]), e)[0]) + penalty for s, e in zip(starts, ends))
+
+
+def cases(count, seed=0):
+    rng = np.random.default_rng(seed)
+    # Found in review: pruning at t before t was a legal start dropped the optimum
+    yield mean_shift_cost, np.array([0.2, -1.0, -0.1, 0.3, 0.2, 1.4, -1.1, -2.2, 1.0, 1.4]), 1.0, 3
+    for _ in range(count):
+        n = int(rng.integers(5, 120))
+        min_size = int(rng.integers(1, 12))
+        if rng.random() < 0.5:
+            values = rng.normal(0, 1, n) + np.repeat(rng.normal(0, 2, 4), -(-n // 4))[:n]
+            yield mean_shift_cost, values, float(rng.uniform(0.1, 10)), min_size
+        else:
+            values = rng.normal(0, 1, n) * np.repeat(rng.uniform(0.2, 3, 4), -(-n // 4))[:n]
+            yield variance_shift_cost, values, float(rng.uniform(0.1, 10)), min_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exactness check and timing for regimes.pelt")
+    parser.add_argument("--cases", type=int, default=300)
+    args = parser.parse_args()
+
+    mismatches = 0
+    for make_cost, values, penalty, min_size in cases(args.cases):
+        cost = make_cost(values)
+        got = pelt(cost, len(values), penalty, min_size)
+        want = exhaustive(cost, len(values), penalty, min_size)
+        if not np.isclose(total_cost(cost, got, penalty), total_cost(cost, want, penalty)):
+            mismatches += 1
+            print(f"Mismatch (min_size={min_size}, penalty={penalty:.3f}): pelt {got} vs exhaustive {want}")
+    print(f"{args.cases + 1} cases, {mismatches} mismatches")
+
+    rng = np.random.default_rng(1)
+    levels = np.repeat(rng.uniform(-0.6, 0.6, 60), 61)[:3650]
+    start = time.perf_counter()
+    ends = pelt(mean_shift_cost(levels), len(levels), 3 * float(np.var(levels)) * np.log(len(levels)), 30)
+    print(f"{len(levels)} days -> {len(ends)} segments in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import json
+import time
+import subprocess
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+FIXTURES_MANIFEST = os.path.join(BENCH_DIR, "fixtures", "manifest.json")
+
+# The backend is a set of scripts rather than a package; mirror the paths they run with
+for sub in ("", "analysis", "scrapers"):
+    path = os.path.join(BACKEND_DIR, sub) if sub else BACKEND_DIR
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def bench_db_url():
+    """Benchmarks only ever touch BENCH_DATABASE_URL, and point DATABASE_URL at it for the code under test."""
+    url = os.getenv("BENCH_DATABASE_URL")
+    if not url:
+        raise SystemExit("BENCH_DATABASE_URL is not set (use a throwaway local Postgres)")
+    os.environ["DATABASE_URL"] = url
+    return url
+
+
+def latency_summary(samples, elapsed=None):
+    samples = np.asarray(samples, dtype=float) * 1000
+    if len(samples) == 0:
+        return {'count': 0}
+    summary = {
+        'count': int(len(samples)),
+        'p50_ms': round(float(np.percentile(samples, 50)), 3),
+        'p99_ms': round(float(np.percentile(samples, 99)), 3),
+        'mean_ms': round(float(samples.mean()), 3),
+        'max_ms': round(float(samples.max()), 3),
+    }
+    if elapsed:
+        summary['throughput_rps'] = round(len(samples) / elapsed, 2)
+    return summary
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def write_results(results, path=None):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    commit = git_commit()
+    results = {'commit': commit, 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), **results}
+    path = path or os.path.join(RESULTS_DIR, f"{commit[:12]}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {path}")
+    return path
@@ -0,0 +1,32 @@
+import sys
+import json
+
+# Prints per-metric changes between two benchmark result files.
+METRICS = ('p50_ms', 'p99_ms', 'throughput_rps', 'transcripts_per_min')
+
+
+def flatten(node, prefix=''):
+    for key, value in node.items():
+        path = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from flatten(value, path)
+        elif key in METRICS:
+            yield path, value
+
+
+def main(old_path, new_path):
+    with open(old_path) as f:
+        old = dict(flatten(json.load(f)))
+    with open(new_path) as f:
+        new = dict(flatten(json.load(f)))
+
+    for path in sorted(set(old) & set(new)):
+        before, after = old[path], new[path]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{path:80s} {before:>12} -> {after:>12} ({change:+.1f}%)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        raise SystemExit("usage: python compare.py OLD.json NEW.json")
+    main(sys.argv[1], sys.argv[2])
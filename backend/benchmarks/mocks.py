@@ -0,0 +1,191 @@
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import numpy as np
+import pandas as pd
+from datetime import date, timedelta
+from sentiment_eng import ToneAnalyzer, WindowAnalysis, SentenceScore
+
+# Local stand-ins for the network dependencies, with configurable latency so
+# benchmarks measure our scheduling and DB work rather than a third party.
+
+
+class MockToneAnalyzer(ToneAnalyzer):
+    """ToneAnalyzer whose API call is a sleep plus deterministic fake scores."""
+
+    def __init__(self, cache=None, latency=0.2, tokens_per_sentence=60):
+        # No super().__init__: building the OpenAI clients needs OPENAI_API_KEY, and nothing here calls them
+        self.cache = cache
+        self.client = None
+        self.async_client = None
+        self.model = "gpt-4o-mini"
+        self.max_workers = 8
+        self.latency = latency
+        self.tokens_per_sentence = tokens_per_sentence
+
+    def fake_window(self, sentences):
+        rng = random.Random(hash(tuple(sentences)))
+        return WindowAnalysis(scores=[
+            SentenceScore(index=i, topic='Inflation', score=round(rng.uniform(-1, 1), 3),
+                          weight=1.0, reasoning='mock')
+            for i in range(len(sentences))
+        ])
+
+    def analyze_window(self, sentences):
+        time.sleep(self.latency)
+        return self.merge_window(sentences, self.fake_window(sentences))
+
+    async def analyze_window_async(self, sentences):
+        await asyncio.sleep(self.latency)
+        result = self.merge_window(sentences, self.fake_window(sentences))
+        await asyncio.to_thread(self.store, sentences, result)
+        return result, 400 + self.tokens_per_sentence * len(sentences)
+
+
+class MockTicker:
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    def history(self, start=None, end=None):
+        days = pd.bdate_range(start=start, end=pd.Timestamp(end) - pd.Timedelta(days=1))
+        walk = 1.30 + np.cumsum(np.random.default_rng(len(days)).normal(0, 0.002, len(days)))
+        return pd.DataFrame({'Close': walk}, index=days)
+
+
+class MockYFinance:
+    Ticker = MockTicker
+
+
+class FixtureResponse:
+    def __init__(self, url, body, status_code=200, headers=None):
+        self.url = url
+        self.content = body if isinstance(body, bytes) else body.encode('utf-8')
+        self.text = self.content.decode('utf-8', errors='replace')
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code} for {self.url}")
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+def pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(pages):
+    """A minimal valid PDF: one Helvetica text line per string, a list of lines per page."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages))), len(pages)).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, lines in enumerate(pages):
+        ops = ["BT", "/F1 10 Tf", "14 TL", "54 740 Td"] + [f"({pdf_escape(line)}) Tj T*" for line in lines] + ["ET"]
+        stream = "\n".join(ops).encode('latin-1')
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode())
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+class FixtureSite:
+    """
+    Synthetic BoC listing/articles and Fed feed/statements keyed by URL. Every
+    fifth Fed statement links a PDF instead of carrying its text, and every
+    tenth PDF is long enough for PdfExtractor's process pool. Recorded pages
+    can be layered on top with load_recorded().
+    """
+
+    BOC_LISTING = "https://www.bankofcanada.ca/press/press-releases/"
+    FED_FEED = "https://www.federalreserve.gov/json/ne-press.json"
+
+    def __init__(self, run_id, articles=50, latency=0.05):
+        self.latency = latency
+        self.pages = {}
+        sentence = "The Governing Council judged that inflation pressures remain broad-based and decided to hold the policy rate. "
+        paragraph = "<p>{}</p>".format(sentence * 3)
+
+        self.boc_links = []
+        for i in range(articles):
+            url = f"https://www.bankofcanada.ca/{run_id}/interest-rate-statement-{i}/"
+            self.boc_links.append((url, f"Interest rate announcement {i}"))
+            self.pages[url] = (
+                f'<html><head><meta name="publication_date" content="{date(2024, 1, 1) + timedelta(days=i)}"></head>'
+                f'<body><div class="post-content">{paragraph * 4}</div></body></html>'
+            )
+
+        self.feed = []
+        for i in range(articles):
+            day = date(2024, 1, 1) + timedelta(days=i)
+            path = f"/newsevents/pressreleases/{run_id}/monetary{day:%Y%m%d}a.htm"
+            self.feed.append({'t': f"Federal Reserve issues FOMC statement {i}", 'l': path})
+            if i % 5 == 0:
+                pdf_path = f"/monetarypolicy/files/{run_id}/monetary{day:%Y%m%d}a1.pdf"
+                page_count = 12 if i % 10 == 0 else 2
+                self.pages["https://www.federalreserve.gov" + pdf_path] = make_pdf([[sentence] * 20] * page_count)
+                body = f'<div id="article"><p><a href="{pdf_path}">Implementation note (PDF)</a></p></div>'
+            else:
+                body = f'<div id="article">{paragraph * 4}</div>'
+            self.pages["https://www.federalreserve.gov" + path] = f'<html><body>{body}</body></html>'
+        self.publish()
+
+    def publish(self):
+        """Renders the BoC listing and the Fed feed (newest first, like the real one) from the known articles."""
+        self.pages[self.BOC_LISTING] = "<html><body>" + "".join(
+            f'<h3 class="media-heading"><a href="{url}">{title}</a></h3>' for url, title in self.boc_links
+        ) + "</body></html>"
+        self.pages[self.FED_FEED] = json.dumps(self.feed[::-1])
+
+    @property
+    def offered(self):
+        return len(self.boc_links) + len(self.feed)
+
+    def load_recorded(self, manifest_path):
+        """
+        The manifest is a JSON list of {url, path[, title]}, path relative to the
+        manifest. Entries with a title are statements, linked from the BoC
+        listing or the Fed feed depending on their host; the rest (PDFs) are
+        only served.
+        """
+        base = os.path.dirname(manifest_path)
+        with open(manifest_path) as f:
+            entries = json.load(f)
+        for entry in entries:
+            with open(os.path.join(base, entry['path']), 'rb') as body:
+                self.pages[entry['url']] = body.read()
+            if not entry.get('title'):
+                continue
+            if 'bankofcanada.ca' in entry['url']:
+                self.boc_links.append((entry['url'], entry['title']))
+            else:
+                self.feed.append({'t': entry['title'], 'l': re.sub(r'^https?://[^/]+', '', entry['url'])})
+        self.publish()
+
+    def get(self, url):
+        time.sleep(self.latency)
+        if url not in self.pages:
+            return FixtureResponse(url, b"", status_code=404)
+        return FixtureResponse(url, self.pages[url])
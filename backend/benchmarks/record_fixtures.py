@@ -0,0 +1,56 @@
+import os
+import json
+import argparse
+import requests
+from urllib.parse import urlparse
+from common import BENCH_DIR
+
+# Records live pages into fixtures/ and adds them to fixtures/manifest.json,
+# which bench_pipeline.bench_scrapers (run.py --fixtures) layers over the
+# synthetic site. Give a title for statements the scrapers should discover;
+# leave it off for documents they only follow links to, such as PDFs.
+#   python record_fixtures.py https://www.federalreserve.gov/newsevents/pressreleases/monetary20240131a.htm \
+#       --title "Federal Reserve issues FOMC statement"
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+MANIFEST = os.path.join(FIXTURES_DIR, "manifest.json")
+HOST_DIRS = {'www.federalreserve.gov': 'fed', 'www.bankofcanada.ca': 'boc'}
+
+
+def record(url, title=None):
+    resp = requests.get(url, timeout=30, headers={'User-Agent': 'Mozilla/5.0 (fixture recorder)'})
+    resp.raise_for_status()
+
+    parsed = urlparse(url)
+    name = os.path.basename(parsed.path.rstrip('/')) or 'index'
+    if '.' not in name:
+        name += '.htm'
+    rel = os.path.join(HOST_DIRS.get(parsed.netloc, parsed.netloc), name)
+    os.makedirs(os.path.join(FIXTURES_DIR, os.path.dirname(rel)), exist_ok=True)
+    with open(os.path.join(FIXTURES_DIR, rel), 'wb') as f:
+        f.write(resp.content)
+
+    entries = []
+    if os.path.exists(MANIFEST):
+        with open(MANIFEST) as f:
+            entries = [e for e in json.load(f) if e['url'] != url]
+    entry = {'url': url, 'path': rel}
+    if title:
+        entry['title'] = title
+    entries.append(entry)
+    with open(MANIFEST, 'w') as f:
+        json.dump(entries, f, indent=2)
+        f.write("\n")
+    print(f"Recorded {url} -> fixtures/{rel} ({len(resp.content)} bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record live pages as scraper benchmark fixtures")
+    parser.add_argument("url")
+    parser.add_argument("--title", help="feed/listing title, for statements the scrapers should find")
+    args = parser.parse_args()
+    record(args.url, args.title)
+
+
+if __name__ == "__main__":
+    main()
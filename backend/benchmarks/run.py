@@ -0,0 +1,43 @@
+import argparse
+import psycopg2
+from common import FIXTURES_MANIFEST, bench_db_url, write_results
+from seed import SCALES, seed
+import bench_api
+import bench_pipeline
+
+# Seeds each requested scale, runs the API load test and the pipeline
+# benchmarks against it, and writes one JSON file per run to results/.
+# Compare two runs with: python compare.py results/<old>.json results/<new>.json
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API and pipeline benchmark suite")
+    parser.add_argument("--scales", nargs="+", choices=SCALES, default=['1k', '100k'])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=25, help="requests per worker per endpoint")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="mocked seconds per scoring call")
+    parser.add_argument("--http-latency", type=float, default=0.05, help="mocked seconds per scraper fetch")
+    parser.add_argument("--fixtures", default=FIXTURES_MANIFEST, help="manifest.json of recorded scraper fixtures")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    results = {'scales': {}}
+    for scale in args.scales:
+        print(f"== scale {scale}")
+        conn = psycopg2.connect(bench_db_url())
+        try:
+            seed(conn, SCALES[scale])
+        finally:
+            conn.close()
+
+        results['scales'][scale] = {
+            'api': bench_api.run(args.concurrency, args.requests),
+            'batch_processor': bench_pipeline.bench_batch_processor(args.llm_latency),
+            'scrapers': bench_pipeline.bench_scrapers(latency=args.http_latency, manifest=args.fixtures),
+        }
+
+    write_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
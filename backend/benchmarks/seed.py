@@ -0,0 +1,104 @@
+import argparse
+import psycopg2
+from common import bench_db_url
+from schema import ensure_schema
+from rollups import refresh_rollups
+
+SCALES = {'1k': 1_000, '100k': 100_000, '10m': 10_000_000}
+
+SENTENCES_PER_TRANSCRIPT = 20
+HISTORY_DAYS = 3650
+
+# The base tables live on Neon and predate schema.py; this mirrors their shape for a local database
+BASE_TABLES = """
+    DROP TABLE IF EXISTS transcript_sentences, transcript_scores, daily_sentiment, transcripts,
+        fx_prices, analysis_cache, http_cache, pdf_text_cache, backfill_partitions, scoring_queue,
+        regime_segments, regime_runs CASCADE;
+    CREATE TABLE transcripts (
+        id SERIAL PRIMARY KEY,
+        bank_name TEXT NOT NULL,
+        publish_date DATE NOT NULL,
+        content TEXT,
+        url TEXT UNIQUE
+    );
+    CREATE TABLE transcript_sentences (
+        id SERIAL PRIMARY KEY,
+        transcript_id INTEGER NOT NULL REFERENCES transcripts (id) ON DELETE CASCADE,
+        sentence_text TEXT,
+        topic TEXT,
+        stance_score DOUBLE PRECISION,
+        impact_weight DOUBLE PRECISION,
+        reasoning TEXT
+    );
+"""
+
+
+def seed(conn, sentences, unscored=200):
+    """
+    Rebuilds a synthetic corpus with `sentences` scored sentences, plus
+    `unscored` transcripts with unique content for the batch_processor run.
+    """
+    transcripts = max(1, sentences // SENTENCES_PER_TRANSCRIPT)
+    with conn.cursor() as cur:
+        cur.execute(BASE_TABLES)
+        conn.commit()
+        ensure_schema(conn)
+
+        cur.execute("""
+            INSERT INTO transcripts (bank_name, publish_date, content, url)
+            SELECT
+                CASE WHEN g %% 2 = 0 THEN 'Fed' ELSE 'BoC' END,
+                DATE '2015-01-01' + (g %% %(days)s),
+                repeat('The Committee decided to maintain the target range for the policy rate. ', 60),
+                'https://bench.local/transcripts/' || g
+            FROM generate_series(1, %(transcripts)s) g;
+        """, {'days': HISTORY_DAYS, 'transcripts': transcripts})
+
+        cur.execute("""
+            INSERT INTO transcript_sentences
+                (transcript_id, sentence_text, topic, stance_score, impact_weight, reasoning)
+            SELECT
+                t.id,
+                'Synthetic sentence ' || s || ' about inflation and the labour market.',
+                (ARRAY['Inflation', 'Growth', 'Employment', 'Guidance', 'Boilerplate'])[1 + s %% 5],
+                random() * 2 - 1,
+                (ARRAY[1.0, 0.7, 0.4, 0.0])[1 + s %% 4],
+                'synthetic'
+            FROM transcripts t
+            CROSS JOIN generate_series(1, %(per)s) s;
+        """, {'per': SENTENCES_PER_TRANSCRIPT})
+
+        cur.execute("""
+            INSERT INTO transcripts (bank_name, publish_date, content, url)
+            SELECT
+                CASE WHEN g %% 2 = 0 THEN 'Fed' ELSE 'BoC' END,
+                DATE '2015-01-01' + %(days)s + (g %% 30),
+                'Unscored statement ' || g || '. ' || repeat('Inflation remains above target and the labour market is tight. ', 40),
+                'https://bench.local/unscored/' || g
+            FROM generate_series(1, %(unscored)s) g;
+        """, {'days': HISTORY_DAYS, 'unscored': unscored})
+
+        # Random-walk USD/CAD over the whole window
+        cur.execute("""
+            INSERT INTO fx_prices (symbol, price_date, close)
+            SELECT 'USDCAD=X', d::date, 1.30 + 0.05 * sin(extract(epoch FROM d) / 8640000.0) + random() * 0.01
+            FROM generate_series(DATE '2014-12-01', DATE '2015-01-01' + %(days)s + 60, INTERVAL '1 day') d
+            WHERE extract(isodow FROM d) < 6;
+        """, {'days': HISTORY_DAYS})
+
+        refresh_rollups(cur)
+        cur.execute("ANALYZE;")
+    conn.commit()
+    print(f"Seeded {transcripts} transcripts / {transcripts * SENTENCES_PER_TRANSCRIPT} sentences (+{unscored} unscored)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the benchmark database with a synthetic corpus")
+    parser.add_argument("--scale", choices=SCALES, default='1k')
+    args = parser.parse_args()
+
+    connection = psycopg2.connect(bench_db_url())
+    try:
+        seed(connection, SCALES[args.scale])
+    finally:
+        connection.close()
@@ -0,0 +1,64 @@
+import time
+import hashlib
+
+
+class LRUCache:
+    """In-process cache holding at most `max_entries` values, least recently used evicted first."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.values = {}
+
+    def get(self, key):
+        value = self.values.pop(key, None)
+        if value is not None:
+            self.values[key] = value
+        return value
+
+    def set(self, key, value):
+        self.values.pop(key, None)
+        self.values[key] = value
+        while len(self.values) > self.max_entries:
+            del self.values[next(iter(self.values))]
+        return value
+
+
+class VersionedCache(LRUCache):
+    """
+    In-process cache for values derived from a table. Entries stay valid
+    until the table's version token (the first row of version_query) changes.
+    The token itself is only re-queried every `ttl` seconds.
+    """
+
+    def __init__(self, version_query, ttl=30, max_entries=256):
+        super().__init__(max_entries)
+        self.version_query = version_query
+        self.ttl = ttl
+        self.version = None
+        self.checked_at = 0.0
+
+    async def current_version(self, pool):
+        if self.version is not None and time.monotonic() - self.checked_at < self.ttl:
+            return self.version
+
+        _, rows = await pool.fetch_all_async(self.version_query)
+        version = '|'.join(str(v) for v in rows[0]) if rows else ''
+        if version != self.version:
+            self.values.clear()
+            self.version = version
+        self.checked_at = time.monotonic()
+        return version
+
+    def etag(self, key=None):
+        digest = hashlib.sha1(f"{self.version}:{key!r}".encode()).hexdigest()
+        return f'"{digest[:32]}"'
+
+
+def etag_matches(request, etag):
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    tags = [t.strip().removeprefix('W/') for t in header.split(',')]
+    return etag in tags
@@ -0,0 +1,169 @@
+import os
+import time
+import asyncio
+import threading
+import warnings
+from contextlib import contextmanager
+import psycopg2
+import pandas as pd
+from psycopg2.pool import ThreadedConnectionPool
+from timing import record, stage
+
+# Suppress pandas SQLAlchemy warnings
+warnings.filterwarnings('ignore', message='.*pandas only supports SQLAlchemy.*')
+
+
+class DatabasePool:
+    """
+    Shared psycopg2 connection pool for the API.
+
+    psycopg2's pool raises as soon as it is exhausted, so a semaphore sized to
+    maxconn makes callers queue for a free connection instead. Neon drops idle
+    connections, so one that sat in the pool longer than idle_check seconds is
+    pinged before it is handed out, and replaced if the ping fails.
+    """
+
+    def __init__(self, dsn, minconn=1, maxconn=10, idle_check=30.0):
+        self.maxconn = maxconn
+        self.idle_check = idle_check
+        # TCP keepalives surface a silently dropped connection instead of hanging on it
+        self.pool = ThreadedConnectionPool(minconn, maxconn, dsn, keepalives=1, keepalives_idle=30,
+                                           keepalives_interval=10, keepalives_count=3)
+        self.slots = threading.BoundedSemaphore(maxconn)
+        self.lock = threading.Lock()
+        self.returned_at = {}
+
+        self.in_use = 0
+        self.waiting = 0
+        self.acquired = 0
+        self.acquire_total = 0.0
+        self.acquire_max = 0.0
+
+    @contextmanager
+    def connection(self):
+        start = time.perf_counter()
+        with self.lock:
+            self.waiting += 1
+        self.slots.acquire()
+        try:
+            conn = self.checkout()
+        except Exception:
+            self.slots.release()
+            with self.lock:
+                self.waiting -= 1
+            raise
+
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.waiting -= 1
+            self.in_use += 1
+            self.acquired += 1
+            self.acquire_total += elapsed
+            self.acquire_max = max(self.acquire_max, elapsed)
+        record('db_acquire', elapsed)
+
+        broken = False
+        try:
+            yield conn
+            conn.commit()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            # Neon drops idle connections; discard instead of returning it to the pool
+            broken = True
+            raise
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            self.release(conn, broken or bool(conn.closed))
+            with self.lock:
+                self.in_use -= 1
+            self.slots.release()
+
+    def checkout(self):
+        # Every pooled connection may be stale after a quiet spell, so allow for replacing all of them
+        for _ in range(self.maxconn):
+            conn = self.pool.getconn()
+            returned_at = self.returned_at.get(conn)
+            if returned_at is None or time.monotonic() - returned_at < self.idle_check:
+                return conn
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                conn.rollback()
+                return conn
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                self.release(conn, True)
+        return self.pool.getconn()
+
+    def release(self, conn, close):
+        if close:
+            self.returned_at.pop(conn, None)
+        else:
+            self.returned_at[conn] = time.monotonic()
+        self.pool.putconn(conn, close=close)
+
+    def read_sql(self, query, params=None):
+        with self.connection() as conn, stage('db_query'):
+            return pd.read_sql(query, conn, params=params)
+
+    def fetch_all(self, query, params=None):
+        """Returns (columns, rows) for the query."""
+        with self.connection() as conn:
+            with conn.cursor() as cur, stage('db_query'):
+                cur.execute(query, params)
+                columns = [desc[0] for desc in cur.description]
+                return columns, cur.fetchall()
+
+    # Async variants run the blocking driver call in a worker thread so
+    # handlers never block the event loop while waiting on Neon.
+    async def read_sql_async(self, query, params=None):
+        return await asyncio.to_thread(self.read_sql, query, params)
+
+    async def fetch_all_async(self, query, params=None):
+        return await asyncio.to_thread(self.fetch_all, query, params)
+
+    def stats(self):
+        with self.lock:
+            avg = self.acquire_total / self.acquired if self.acquired else 0.0
+            return {
+                'max_connections': self.maxconn,
+                'in_use': self.in_use,
+                'waiting': self.waiting,
+                'acquired_total': self.acquired,
+                'acquire_avg_ms': round(avg * 1000, 3),
+                'acquire_max_ms': round(self.acquire_max * 1000, 3),
+            }
+
+    def close(self):
+        self.pool.closeall()
+
+
+_pool = None
+
+
+def init_pool():
+    global _pool
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise ValueError("DATABASE_URL is missing from .env")
+    _pool = DatabasePool(
+        db_url,
+        minconn=int(os.getenv("DB_POOL_MIN", 1)),
+        maxconn=int(os.getenv("DB_POOL_MAX", 10)),
+        idle_check=float(os.getenv("DB_POOL_IDLE_CHECK", 30)),
+    )
+    return _pool
+
+
+def get_pool():
+    if _pool is None:
+        return init_pool()
+    return _pool
+
+
+def close_pool():
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
@@ -0,0 +1,99 @@
+import os
+import psycopg2
+import pandas as pd
+import yfinance as yf
+from dotenv import load_dotenv
+from datetime import date, timedelta
+from psycopg2.extras import execute_values
+
+load_dotenv()
+
+FX_SYMBOL = "USDCAD=X"
+
+# Default history when neither the store nor transcripts give a start date
+DEFAULT_LOOKBACK_DAYS = 730
+# A first bar this close to the wanted start is a weekend/holiday gap, not missing history
+HEAD_SLACK_DAYS = 7
+
+
+def last_stored_date(cur, symbol=FX_SYMBOL):
+    cur.execute("SELECT MAX(price_date) FROM fx_prices WHERE symbol = %s;", (symbol,))
+    return cur.fetchone()[0]
+
+
+def first_stored_date(cur, symbol=FX_SYMBOL):
+    cur.execute("SELECT MIN(price_date) FROM fx_prices WHERE symbol = %s;", (symbol,))
+    return cur.fetchone()[0]
+
+
+def backfill_start(cur):
+    cur.execute("SELECT MIN(publish_date) FROM transcripts;")
+    first = cur.fetchone()[0]
+    if first is None:
+        return date.today() - timedelta(days=DEFAULT_LOOKBACK_DAYS)
+    return first - timedelta(days=30)
+
+
+def missing_head(cur, symbol=FX_SYMBOL):
+    """(start, end) of the bars missing before the first stored one, or None when the store reaches back far enough."""
+    first = first_stored_date(cur, symbol)
+    wanted = backfill_start(cur)
+    # Weekends and holidays mean the first bar can fall a few days after the wanted start
+    if first is None or wanted >= first - timedelta(days=HEAD_SLACK_DAYS):
+        return None
+    return wanted, first
+
+
+def fetch_bars(cur, symbol, start, end):
+    """Upserts the bars in [start, end) and returns how many were written."""
+    if start >= end:
+        return 0
+    hist = yf.Ticker(symbol).history(start=start, end=end)
+    if hist.empty:
+        return 0
+
+    dates = pd.to_datetime(hist.index).date
+    rows = [(symbol, d, float(p)) for d, p in zip(dates, hist['Close']) if pd.notna(p)]
+    if not rows:
+        return 0
+    execute_values(cur, """
+        INSERT INTO fx_prices (symbol, price_date, close) VALUES %s
+        ON CONFLICT (symbol, price_date) DO UPDATE SET close = EXCLUDED.close;
+    """, rows)
+    return len(rows)
+
+
+def refresh_fx_prices(conn, symbol=FX_SYMBOL):
+    """
+    Fetches only the bars missing at either end of the store and upserts them.
+    The head gap opens when older transcripts arrive (e.g. a backfill). At the
+    tail, the last stored bar is fetched again since today's close keeps moving
+    until the session ends. Returns the number of rows written.
+    """
+    with conn.cursor() as cur:
+        last = last_stored_date(cur, symbol)
+        end = date.today() + timedelta(days=1)
+        if last is None:
+            written = fetch_bars(cur, symbol, backfill_start(cur), end)
+        else:
+            written = fetch_bars(cur, symbol, last, end)
+            head = missing_head(cur, symbol)
+            if head:
+                written += fetch_bars(cur, symbol, *head)
+    conn.commit()
+    return written
+
+
+def is_stale(last, max_age_days=1):
+    return last is None or last < date.today() - timedelta(days=max_age_days)
+
+
+if __name__ == "__main__":
+    connection = psycopg2.connect(os.getenv("DATABASE_URL"))
+    try:
+        written = refresh_fx_prices(connection)
+        print(f"Stored {written} {FX_SYMBOL} bars.")
+    except Exception as e:
+        print(f"FX refresh error: {e}")
+    finally:
+        connection.close()
@@ -1,22 +1,42 @@
-
 import os
 import re
 import io
 import json
-import psycopg2
+import time
+import asyncio
+import orjson
+import numpy as np
 import pandas as pd
-import yfinance as yf
-import warnings
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Query, Request, Response
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
-
-# Suppress pandas SQLAlchemy warnings
-warnings.filterwarnings('ignore', message='.*pandas only supports SQLAlchemy.*')
+from typing import Literal, Optional
+from datetime import date, datetime, timedelta
+from db import init_pool, get_pool, close_pool
+from cache import LRUCache, VersionedCache, etag_matches
+from series import SentimentMatrix, align_prices, encode_series, min_max, slice_range, window
+from analytics import analyze
+from search import search_cursor, sentence_query, transcript_query
+from fx_store import FX_SYMBOL, last_stored_date, missing_head, is_stale, refresh_fx_prices
+from timing import TimingMiddleware, metrics, stage
 
 load_dotenv()
-app = FastAPI()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    try:
+        init_pool()
+    except Exception as e:
+        print(f"Pool init error: {e}")
+    yield
+    close_pool()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,144 +44,491 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
     allow_credentials=True,
+    expose_headers=["ETag", "X-Next-Cursor", "Server-Timing"],
 )
 
+# Brotli is optional; BrotliMiddleware also falls back to gzip for clients without br
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=1000)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=1000)
 
-def get_db_connection():
-    db_url = os.getenv("DATABASE_URL")
-    if not db_url:
-        raise ValueError("DATABASE_URL is missing from .env")
-    return psycopg2.connect(db_url)
+# Outermost, so Server-Timing's total includes compression
+app.add_middleware(TimingMiddleware)
 
-@app.get("/api/divergence")
-def get_divergence():
-    try:
-        conn = get_db_connection()
 
-        query = """
-            SELECT publish_date as date, bank_name, AVG(stance_score) as sentiment
-            FROM transcript_sentences
-            JOIN transcripts ON transcript_sentences.transcript_id = transcripts.id
-            GROUP BY 1, 2
-        """
-        df = pd.read_sql(query, conn)
-        conn.close()
+def json_bytes(body, headers=None):
+    return Response(content=body, media_type='application/json', headers=headers)
+
 
-        if df.empty:
-            return []
+# Range and downsampling parameters shared by the chart endpoints
+START_QUERY = Query(None, description="First date to include (YYYY-MM-DD)")
+END_QUERY = Query(None, description="Last date to include (YYYY-MM-DD)")
+MAX_POINTS_QUERY = Query(None, ge=3, le=20000, description="Downsample (LTTB) to at most this many points")
 
-        df = df.pivot(index='date', columns='bank_name', values='sentiment')
-        all_dates = pd.date_range(start=df.index.min(), end=df.index.max(), freq='D')
-        df = df.reindex(all_dates)
-        df = df.ffill().fillna(0)
 
-        fed_col = 'Fed' if 'Fed' in df.columns else 'fed'
-        boc_col = 'BoC' if 'BoC' in df.columns else 'boc'
+divergence_cache = VersionedCache(
+    "SELECT COUNT(*), MAX(updated_at) FROM daily_sentiment",
+    ttl=int(os.getenv("DIVERGENCE_CACHE_TTL", 30)),
+)
 
-        df['divergence'] = df[fed_col] - df[boc_col]
-        df = df.reset_index().rename(columns={'index': 'date'})
-        df['date'] = df['date'].dt.strftime('%Y-%m-%d')
-        df = df.rename(columns={fed_col: 'fed', boc_col: 'boc'})
 
-        return df.to_dict(orient='records')
+@app.get("/api/divergence")
+async def get_divergence(
+    request: Request,
+    mode: Literal['plain', 'impact', 'decay'] = 'plain',
+    half_life: float = Query(30.0, gt=0, description="Decay half-life in days, used by mode=decay"),
+    freq: Literal['daily', 'weekly'] = 'daily',
+    format: Literal['records', 'columnar'] = 'records',
+    start: Optional[date] = START_QUERY,
+    end: Optional[date] = END_QUERY,
+    max_points: Optional[int] = MAX_POINTS_QUERY,
+):
+    try:
+        pool = get_pool()
+        await divergence_cache.current_version(pool)
+        series_key = (mode, half_life if mode == 'decay' else None, freq)
+        key = (series_key, format, start, end, max_points)
+        etag = divergence_cache.etag(key)
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+
+        body = divergence_cache.get(key)
+        if body is not None:
+            return json_bytes(body, headers)
+
+        series = divergence_cache.get(series_key)
+        if series is None:
+            matrix = divergence_cache.get('matrix')
+            if matrix is None:
+                query = """
+                    SELECT publish_date as date, bank_name, sentiment, weighted_sentiment, sentence_count
+                    FROM daily_sentiment
+                """
+                df = await pool.read_sql_async(query)
+                with stage('transform'):
+                    matrix = divergence_cache.set('matrix', SentimentMatrix(df))
+
+            with stage('transform'):
+                series = divergence_cache.set(series_key, matrix.divergence(mode, half_life, freq))
+
+        days, fed, boc, divergence = series
+        with stage('transform'):
+            days, columns = window(days, {'boc': boc, 'fed': fed, 'divergence': divergence},
+                                   start, end, max_points, shape_by='divergence')
+        with stage('serialize'):
+            body = divergence_cache.set(key, encode_series(days, format, **columns))
+        return json_bytes(body, headers)
 
     except Exception as e:
         print(f"Server Error: {e}")
         return []
 
-@app.get("/api/usdcad")
-def get_usdcad():
+
+FX_REFRESH_INTERVAL = int(os.getenv("FX_REFRESH_INTERVAL", 3600))
+fx_refresh_state = {'checked_at': 0.0}
+
+fx_cache = VersionedCache(
+    """
+    SELECT COUNT(*), MAX(price_date),
+           (SELECT MIN(publish_date) FROM transcripts),
+           (SELECT MAX(publish_date) FROM transcripts)
+    FROM fx_prices
+    """,
+    ttl=int(os.getenv("FX_CACHE_TTL", 60)),
+)
+
+
+def refresh_fx_if_stale():
+    with get_pool().connection() as conn:
+        with conn.cursor() as cur:
+            last = last_stored_date(cur)
+            head = missing_head(cur)
+        if is_stale(last) or head:
+            written = refresh_fx_prices(conn)
+            print(f"Refreshed {written} {FX_SYMBOL} bars")
+
+
+async def refresh_fx():
     try:
-        conn = get_db_connection()
-        query = "SELECT MIN(publish_date) as min_date, MAX(publish_date) as max_date FROM transcripts"
-        df = pd.read_sql(query, conn)
-        conn.close()
-
-        if df.empty or df['min_date'].isna().any():
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=730)
-        else:
-            start_date = df['min_date'].iloc[0]
-            end_date = df['max_date'].iloc[0]
-            start_date = start_date - timedelta(days=30)
-            end_date = end_date + timedelta(days=30)
+        await asyncio.to_thread(refresh_fx_if_stale)
+    except Exception as e:
+        print(f"USD/CAD refresh error: {e}")
 
-        ticker = yf.Ticker("USDCAD=X")
-        hist = ticker.history(start=start_date, end=end_date)
 
-        if hist.empty:
-            return []
+def maybe_refresh_fx():
+    # Top up the local store at most once per interval; the hourly pipeline normally keeps it fresh.
+    # Runs in the background so yfinance latency never reaches a request; fx_cache picks up the new bars.
+    if time.monotonic() - fx_refresh_state['checked_at'] > FX_REFRESH_INTERVAL:
+        fx_refresh_state['checked_at'] = time.monotonic()
+        fx_refresh_state['task'] = asyncio.create_task(refresh_fx())
 
-        fx_df = pd.DataFrame({'price': hist['Close']})
-        fx_df.index = pd.to_datetime(fx_df.index).date
 
-        all_dates = pd.date_range(start=start_date, end=end_date, freq='D')
-        fx_df = fx_df.reindex(all_dates.date).ffill()
+def build_usdcad(fx, start_date, end_date):
+    """Returns (days, price, normalized) arrays, forward-filled over the daily window."""
+    empty = (np.array([], dtype='datetime64[D]'), np.array([]), np.array([]))
+    if fx.empty:
+        return empty
 
-        min_price = fx_df['price'].min()
-        max_price = fx_df['price'].max()
-        fx_df['normalized'] = (fx_df['price'] - min_price) / (max_price - min_price)
+    prices = pd.Series(fx['close'].to_numpy(), index=pd.to_datetime(fx['price_date']))
+    all_dates = pd.date_range(start=pd.Timestamp(start_date).normalize(), end=pd.Timestamp(end_date).normalize(), freq='D')
+    prices = prices.reindex(all_dates).ffill().dropna()
+    if prices.empty:
+        return empty
 
-        result = []
-        for date, row in fx_df.iterrows():
-            if pd.notna(row['price']):
-                result.append({
-                    'date': pd.Timestamp(date).strftime('%Y-%m-%d'),
-                    'price': round(float(row['price']), 4),
-                    'normalized': round(float(row['normalized']), 4)
-                })
+    min_price = prices.min()
+    price_range = prices.max() - min_price
+    normalized = (prices - min_price) / price_range if price_range else prices * 0.0
+
+    days = prices.index.to_numpy().astype('datetime64[D]')
+    return days, prices.round(4).to_numpy(), normalized.round(4).to_numpy()
 
-        return result
+
+@app.get("/api/usdcad")
+async def get_usdcad(
+    format: Literal['records', 'columnar'] = 'records',
+    start: Optional[date] = START_QUERY,
+    end: Optional[date] = END_QUERY,
+    max_points: Optional[int] = MAX_POINTS_QUERY,
+):
+    try:
+        pool = get_pool()
+
+        maybe_refresh_fx()
+        await fx_cache.current_version(pool)
+        key = (format, start, end, max_points)
+        body = fx_cache.get(key)
+        if body is not None:
+            return json_bytes(body)
+
+        series = fx_cache.get('daily')
+        if series is None:
+            series = fx_cache.set('daily', await load_usdcad(pool))
+
+        days, price, normalized = series
+        with stage('transform'):
+            if start or end:
+                # Normalize over the requested range rather than the whole history
+                lo, hi = slice_range(days, start, end)
+                days, price = days[lo:hi], price[lo:hi]
+                normalized = np.round(min_max(price), 4)
+            days, columns = window(days, {'price': price, 'normalized': normalized},
+                                   max_points=max_points, shape_by='price')
+        with stage('serialize'):
+            body = fx_cache.set(key, encode_series(days, format, **columns))
+        return json_bytes(body)
 
     except Exception as e:
         print(f"USD/CAD fetch error: {e}")
         return []
 
-@app.get("/api/transcripts")
-def get_transcripts():
+
+async def load_usdcad(pool):
+    query = "SELECT MIN(publish_date) as min_date, MAX(publish_date) as max_date FROM transcripts"
+    df = await pool.read_sql_async(query)
+
+    if df.empty or df['min_date'].isna().any():
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=730)
+    else:
+        start_date = df['min_date'].iloc[0]
+        end_date = df['max_date'].iloc[0]
+        start_date = start_date - timedelta(days=30)
+        end_date = end_date + timedelta(days=30)
+
+    fx = await pool.read_sql_async("""
+        SELECT price_date, close
+        FROM fx_prices
+        WHERE symbol = %s AND price_date >= %s AND price_date < %s
+        ORDER BY price_date
+    """, (FX_SYMBOL, start_date, end_date))
+
+    with stage('transform'):
+        return build_usdcad(fx, start_date, end_date)
+
+
+dashboard_cache = VersionedCache(
+    """
+    SELECT COUNT(*), MAX(updated_at),
+           (SELECT COUNT(*) FROM fx_prices),
+           (SELECT MAX(price_date) FROM fx_prices)
+    FROM daily_sentiment
+    """,
+    ttl=int(os.getenv("DIVERGENCE_CACHE_TTL", 30)),
+)
+
+
+async def load_dashboard_inputs(pool):
+    """Sentiment matrix and FX bars, fetched concurrently and cached until either table changes."""
+    inputs = dashboard_cache.get('inputs')
+    if inputs is not None:
+        return inputs
+
+    sentiment_df, fx = await asyncio.gather(
+        pool.read_sql_async("""
+            SELECT publish_date as date, bank_name, sentiment, weighted_sentiment, sentence_count
+            FROM daily_sentiment
+        """),
+        pool.read_sql_async("""
+            SELECT price_date, close
+            FROM fx_prices
+            WHERE symbol = %s
+            ORDER BY price_date
+        """, (FX_SYMBOL,)),
+    )
+    with stage('transform'):
+        price_days = pd.to_datetime(fx['price_date']).to_numpy().astype('datetime64[D]')
+        inputs = (SentimentMatrix(sentiment_df), price_days, fx['close'].to_numpy(dtype=float))
+    return dashboard_cache.set('inputs', inputs)
+
+
+@app.get("/api/dashboard")
+async def get_dashboard(
+    request: Request,
+    mode: Literal['plain', 'impact', 'decay'] = 'plain',
+    half_life: float = Query(30.0, gt=0, description="Decay half-life in days, used by mode=decay"),
+    freq: Literal['daily', 'weekly'] = 'daily',
+    format: Literal['records', 'columnar'] = 'records',
+    start: Optional[date] = START_QUERY,
+    end: Optional[date] = END_QUERY,
+    max_points: Optional[int] = MAX_POINTS_QUERY,
+):
+    """Divergence and USD/CAD on one date axis: the sentiment window, with FX forward-filled onto it."""
     try:
-        conn = get_db_connection()
+        pool = get_pool()
+        maybe_refresh_fx()
+        await dashboard_cache.current_version(pool)
+        key = (mode, half_life if mode == 'decay' else None, freq, format, start, end, max_points)
+        etag = dashboard_cache.etag(key)
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+
+        body = dashboard_cache.get(key)
+        if body is None:
+            matrix, price_days, prices = await load_dashboard_inputs(pool)
+            with stage('transform'):
+                days, fed, boc, divergence = matrix.divergence(mode, half_life, freq)
+                lo, hi = slice_range(days, start, end)
+                days, fed, boc, divergence = days[lo:hi], fed[lo:hi], boc[lo:hi], divergence[lo:hi]
+                price, normalized = align_prices(days, price_days, prices)
+                days, columns = window(days, {
+                    'fed': fed, 'boc': boc, 'divergence': divergence, 'price': price, 'normalized': normalized,
+                }, max_points=max_points, shape_by='divergence')
+            with stage('serialize'):
+                body = dashboard_cache.set(key, encode_series(days, format, **columns))
+        return json_bytes(body, headers)
+
+    except Exception as e:
+        print(f"Dashboard fetch error: {e}")
+        return []
+
+
+def range_cutoff(time_range):
+    """First day of a dashboard time range ('90d', '1y', '3y'), or None for 'all'."""
+    today = pd.Timestamp.today().normalize()
+    offsets = {'90d': pd.DateOffset(days=90), '1y': pd.DateOffset(years=1), '3y': pd.DateOffset(years=3)}
+    if time_range not in offsets:
+        return None
+    return np.datetime64((today - offsets[time_range]).date(), 'D')
+
+
+@app.get("/api/analytics")
+async def get_analytics(
+    request: Request,
+    time_range: Literal['all', '90d', '1y', '3y'] = Query('all', alias='range'),
+    mode: Literal['plain', 'impact', 'decay'] = 'plain',
+    half_life: float = Query(30.0, gt=0, description="Decay half-life in days, used by mode=decay"),
+    window: int = Query(30, ge=2, le=365, description="Rolling window in days"),
+    max_lag: int = Query(60, ge=0, le=365, description="Largest lag in days for the USD/CAD cross-correlation"),
+):
+    """Rolling volatility and z-scores of the daily divergence, plus its lead/lag correlation with USD/CAD returns."""
+    try:
+        pool = get_pool()
+        maybe_refresh_fx()
+        await dashboard_cache.current_version(pool)
+        cutoff = range_cutoff(time_range)
+        key = ('analytics', mode, half_life if mode == 'decay' else None, str(cutoff), window, max_lag)
+        etag = dashboard_cache.etag(key)
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+
+        body = dashboard_cache.get(key)
+        if body is None:
+            matrix, price_days, prices = await load_dashboard_inputs(pool)
+            with stage('transform'):
+                days, _, _, divergence = matrix.divergence(mode, half_life, 'daily')
+                if cutoff is not None:
+                    keep = days >= cutoff
+                    days, divergence = days[keep], divergence[keep]
+                payload = analyze(days, divergence, price_days, prices, window, max_lag)
+            with stage('serialize'):
+                body = dashboard_cache.set(key, orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY))
+        return json_bytes(body, headers)
+
+    except Exception as e:
+        print(f"Analytics error: {e}")
+        return {}
+
 
-        query = """
+# Segments are computed offline by regimes.py; this only serves what it stored
+regime_cache = VersionedCache(
+    "SELECT COUNT(*), MAX(computed_at) FROM regime_runs",
+    ttl=int(os.getenv("REGIME_CACHE_TTL", 60)),
+)
+
+
+@app.get("/api/regimes")
+async def get_regimes(
+    request: Request,
+    series: Optional[Literal['divergence', 'usdcad']] = None,
+    start: Optional[date] = START_QUERY,
+    end: Optional[date] = END_QUERY,
+):
+    """Detected regimes as {series: [{start, end, label, mean, std, observations}]}, oldest first."""
+    try:
+        pool = get_pool()
+        await regime_cache.current_version(pool)
+        key = (series, start, end)
+        etag = regime_cache.etag(key)
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+
+        body = regime_cache.get(key)
+        if body is None:
+            # Segments overlapping [start, end], not just those inside it
+            where, params = [], []
+            if series:
+                where.append("series = %s")
+                params.append(series)
+            if start:
+                where.append("segment_end >= %s")
+                params.append(start)
+            if end:
+                where.append("segment_start <= %s")
+                params.append(end)
+            _, rows = await pool.fetch_all_async(f"""
+                SELECT series, segment_start, segment_end, label, mean, std, observations
+                FROM regime_segments
+                {"WHERE " + " AND ".join(where) if where else ""}
+                ORDER BY series, segment_start
+            """, tuple(params))
+
+            with stage('transform'):
+                result = {name: [] for name in ([series] if series else ['divergence', 'usdcad'])}
+                for name, seg_start, seg_end, label, mean, std, observations in rows:
+                    result[name].append({
+                        'start': seg_start.strftime('%Y-%m-%d'),
+                        'end': seg_end.strftime('%Y-%m-%d'),
+                        'label': label,
+                        'mean': round(float(mean), 4) if mean is not None else None,
+                        'std': round(float(std), 4) if std is not None else None,
+                        'observations': int(observations),
+                    })
+            with stage('serialize'):
+                body = regime_cache.set(key, orjson.dumps(result))
+        return json_bytes(body, headers)
+
+    except Exception as e:
+        print(f"Regimes error: {e}")
+        return {}
+
+
+TRANSCRIPTS_PAGE_SIZE = 50
+TRANSCRIPTS_MAX_PAGE_SIZE = 200
+EXCERPT_CHARS = 500
+
+
+def parse_cursor(cursor):
+    """Cursors are '<publish_date>_<id>' of the last row on the previous page."""
+    raw_date, raw_id = cursor.rsplit('_', 1)
+    return datetime.strptime(raw_date, '%Y-%m-%d').date(), int(raw_id)
+
+
+def transcript_title(bank, publish_date, url):
+    title = ''
+    if url:
+        url_parts = url.split('/')
+        title = url_parts[-1].replace('-', ' ').replace('_', ' ').title() if url_parts else ''
+    if not title:
+        title = f"{bank} - {publish_date.strftime('%B %Y') if publish_date else ''}"
+    return title
+
+
+@app.get("/api/transcripts")
+async def get_transcripts(
+    response: Response,
+    limit: int = TRANSCRIPTS_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    bank: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+):
+    try:
+        limit = max(1, min(limit, TRANSCRIPTS_MAX_PAGE_SIZE))
+
+        # Keyset pagination on (publish_date, id), newest first
+        where, params = [], []
+        if bank:
+            where.append("LOWER(t.bank_name) = LOWER(%s)")
+            params.append(bank)
+        if start:
+            where.append("t.publish_date >= %s")
+            params.append(start)
+        if end:
+            where.append("t.publish_date <= %s")
+            params.append(end)
+        if cursor:
+            where.append("(t.publish_date, t.id) < (%s, %s)")
+            params.extend(parse_cursor(cursor))
+
+        # One extra char tells us whether the excerpt was truncated without pulling the whole body
+        query = f"""
             SELECT
                 t.id,
                 t.bank_name as bank,
                 t.publish_date as date,
-                t.content,
+                SUBSTRING(t.content FROM 1 FOR {EXCERPT_CHARS + 1}) as excerpt,
                 t.url,
-                AVG(ts.stance_score) as sentiment
+                ts.mean_score as sentiment,
+                ts.weighted_score,
+                ts.sentence_count
             FROM transcripts t
-            LEFT JOIN transcript_sentences ts ON t.id = ts.transcript_id
-            GROUP BY t.id, t.bank_name, t.publish_date, t.content, t.url
-            ORDER BY t.publish_date DESC
+            LEFT JOIN transcript_scores ts ON ts.transcript_id = t.id
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY t.publish_date DESC, t.id DESC
+            LIMIT %s
         """
+        params.append(limit + 1)
 
-        df = pd.read_sql(query, conn)
-        conn.close()
+        _, rows = await get_pool().fetch_all_async(query, tuple(params))
 
-        if df.empty:
-            return []
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_id, last_date = rows[-1][0], rows[-1][2]
+            response.headers['X-Next-Cursor'] = f"{last_date.strftime('%Y-%m-%d')}_{last_id}"
 
         result = []
-        for _, row in df.iterrows():
-            content = row['content'] if pd.notna(row['content']) else ''
-            excerpt = content[:500] + '...' if content and len(content) > 500 else content
-
-            title = ''
-            if pd.notna(row['url']):
-                url_parts = row['url'].split('/')
-                title = url_parts[-1].replace('-', ' ').replace('_', ' ').title() if url_parts else ''
-            if not title:
-                title = f"{row['bank']} - {row['date'].strftime('%B %Y') if pd.notna(row['date']) else ''}"
-
-            result.append({
-                'id': int(row['id']),
-                'bank': row['bank'],
-                'date': row['date'].strftime('%Y-%m-%d') if pd.notna(row['date']) else '',
-                'title': title,
-                'excerpt': excerpt,
-                'sentiment': round(float(row['sentiment']), 3) if pd.notna(row['sentiment']) else 0.0
-            })
+        with stage('transform'):
+            for t_id, t_bank, t_date, excerpt, url, sentiment, weighted, sentence_count in rows:
+                excerpt = excerpt or ''
+                if len(excerpt) > EXCERPT_CHARS:
+                    excerpt = excerpt[:EXCERPT_CHARS] + '...'
+
+                result.append({
+                    'id': int(t_id),
+                    'bank': t_bank,
+                    'date': t_date.strftime('%Y-%m-%d') if t_date else '',
+                    'title': transcript_title(t_bank, t_date, url),
+                    'excerpt': excerpt,
+                    'sentiment': round(float(sentiment), 3) if sentiment is not None else 0.0,
+                    'weighted_sentiment': round(float(weighted), 3) if weighted is not None else 0.0,
+                    'sentence_count': int(sentence_count or 0)
+                })
 
         return result
 
@@ -169,52 +536,162 @@ def get_transcripts():
         print(f"Transcripts fetch error: {e}")
         return []
 
+# Scored sentences never change once written, so they are cached per transcript
+# with no invalidation; transcripts with no sentences yet are never cached.
+sentence_cache = LRUCache(max_entries=int(os.getenv("SENTENCE_CACHE_SIZE", 2000)))
+SENTENCES_MAX_IDS = 100
+
+
+def sentence_item(s_id, text, score, impact, topic, reasoning):
+    return {
+        'id': s_id,
+        'text': text or '',
+        'score': round(float(score), 3) if score is not None else 0.0,
+        'impact': round(float(impact), 3) if impact is not None else 0.0,
+        'topic': topic or '',
+        'reasoning': reasoning or ''
+    }
+
+
+async def load_sentences(transcript_ids):
+    """{transcript_id: [sentence, ...]} in id order, one query for whatever isn't cached."""
+    result = {t_id: sentence_cache.get(t_id) for t_id in dict.fromkeys(transcript_ids)}
+    missing = [t_id for t_id, cached in result.items() if cached is None]
+    if not missing:
+        return result
+
+    query = """
+        SELECT
+            ts.transcript_id,
+            ts.id,
+            ts.sentence_text,
+            ts.stance_score,
+            ts.impact_weight,
+            ts.topic,
+            ts.reasoning
+        FROM transcript_sentences ts
+        WHERE ts.transcript_id = ANY(%s)
+        ORDER BY ts.transcript_id, ts.id ASC
+    """
+    _, rows = await get_pool().fetch_all_async(query, (missing,))
+
+    with stage('transform'):
+        grouped = {t_id: [] for t_id in missing}
+        for t_id, *sentence in rows:
+            grouped[t_id].append(sentence_item(*sentence))
+        for t_id, items in grouped.items():
+            if items:
+                sentence_cache.set(t_id, items)
+        result.update(grouped)
+    return result
+
+
 @app.get("/api/transcripts/{transcript_id}/sentences")
-def get_transcript_sentences(transcript_id: int):
+async def get_transcript_sentences(transcript_id: int):
     try:
-        conn = get_db_connection()
-
-        query = """
-            SELECT
-                ts.id,
-                ts.sentence_text,
-                ts.stance_score,
-                ts.impact_weight,
-                ts.topic,
-                ts.reasoning
-            FROM transcript_sentences ts
-            WHERE ts.transcript_id = %s
-            ORDER BY ts.id ASC
-        """
+        return (await load_sentences([transcript_id]))[transcript_id]
+    except Exception as e:
+        print(f"Transcript sentences fetch error: {e}")
+        return []
 
-        cursor = conn.cursor()
-        cursor.execute(query, (transcript_id,))
-        columns = [desc[0] for desc in cursor.description]
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
 
-        if not rows:
-            return []
+@app.get("/api/sentences")
+async def get_sentences(ids: list[int] = Query(..., max_length=SENTENCES_MAX_IDS, description="Transcript ids, repeated")):
+    """Sentences for several transcripts in one round trip, as {transcript_id: [...]}."""
+    try:
+        return await load_sentences(ids)
+    except Exception as e:
+        print(f"Sentences fetch error: {e}")
+        return {}
+
+SEARCH_PAGE_SIZE = 50
+SEARCH_MAX_PAGE_SIZE = 200
+
+
+@app.get("/api/search")
+async def search(
+    response: Response,
+    q: Optional[str] = Query(None, description="Web-search syntax: words, \"phrases\", OR, -excluded"),
+    scope: Literal['sentences', 'transcripts'] = 'sentences',
+    bank: Optional[str] = None,
+    topic: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    sort: Optional[Literal['rank', 'date']] = None,
+    limit: int = SEARCH_PAGE_SIZE,
+    cursor: Optional[str] = None,
+):
+    try:
+        limit = max(1, min(limit, SEARCH_MAX_PAGE_SIZE))
+        q = (q or '').strip() or None
+        # Relevance order needs a query to rank against
+        sort = (sort or 'rank') if q else 'date'
 
-        result = []
-        for row in rows:
-            row_dict = dict(zip(columns, row))
-            result.append({
-                'id': row_dict['id'],
-                'text': row_dict['sentence_text'] if row_dict['sentence_text'] else '',
-                'score': round(float(row_dict['stance_score']), 3) if row_dict['stance_score'] is not None else 0.0,
-                'impact': round(float(row_dict['impact_weight']), 3) if row_dict['impact_weight'] is not None else 0.0,
-                'topic': row_dict['topic'] if row_dict['topic'] else '',
-                'reasoning': row_dict['reasoning'] if row_dict['reasoning'] else ''
-            })
+        if scope == 'transcripts':
+            query, params = transcript_query(q, bank, start, end, sort, cursor, limit)
+        else:
+            query, params = sentence_query(q, bank, topic, min_score, max_score, start, end, sort, cursor, limit)
+
+        columns, rows = await get_pool().fetch_all_async(query, tuple(params))
+
+        with stage('transform'):
+            hits = [dict(zip(columns, row)) for row in rows]
+            if len(hits) > limit:
+                hits = hits[:limit]
+                response.headers['X-Next-Cursor'] = search_cursor(hits[-1]['sort_key'], hits[-1]['id'], sort)
+
+            result = []
+            for hit in hits:
+                item = {
+                    'id': int(hit['id']),
+                    'bank': hit['bank'],
+                    'date': hit['date'].strftime('%Y-%m-%d') if hit['date'] else '',
+                    'rank': round(hit['rank'], 4) if hit['rank'] is not None else None,
+                }
+                if scope == 'transcripts':
+                    item['title'] = transcript_title(hit['bank'], hit['date'], hit['url'])
+                    item['snippet'] = hit.get('snippet') or ''
+                else:
+                    item.update({
+                        'transcript_id': int(hit['transcript_id']),
+                        'text': hit['sentence_text'] or '',
+                        'topic': hit['topic'] or '',
+                        'score': round(float(hit['stance_score']), 3) if hit['stance_score'] is not None else 0.0,
+                        'impact': round(float(hit['impact_weight']), 3) if hit['impact_weight'] is not None else 0.0,
+                    })
+                result.append(item)
 
         return result
 
     except Exception as e:
-        print(f"Transcript sentences fetch error: {e}")
+        print(f"Search error: {e}")
         return []
 
+@app.get("/api/pool")
+def get_pool_stats():
+    try:
+        return get_pool().stats()
+    except Exception as e:
+        print(f"Pool stats error: {e}")
+        return {}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    gauges = {}
+    try:
+        pool_stats = get_pool().stats()
+        gauges = {
+            'finsent_db_pool_in_use': ("Connections currently checked out.", pool_stats['in_use']),
+            'finsent_db_pool_waiting': ("Callers waiting for a connection.", pool_stats['waiting']),
+            'finsent_db_pool_max': ("Pool size limit.", pool_stats['max_connections']),
+        }
+    except Exception as e:
+        print(f"Pool stats error: {e}")
+    return PlainTextResponse(metrics.render(gauges), media_type="text/plain; version=0.0.4")
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,212 @@
+import os
+import psycopg2
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from psycopg2.extras import execute_values
+from series import SentimentMatrix
+from fx_store import FX_SYMBOL
+
+load_dotenv()
+
+# Regime segmentation, stored in regime_segments for /api/regimes:
+#   divergence - shifts in the level of the daily Fed - BoC divergence
+#   usdcad     - shifts in the volatility of USD/CAD daily log returns
+# Segments come from PELT, which finds the exact optimum of the penalized
+# cost while pruning split points that can never win again, so a run is close
+# to linear in the series length (benchmarks/bench_regimes.py checks it
+# against exhaustive dynamic programming). Each series is only recomputed when its
+# inputs (or the settings below) changed since the run recorded in regime_runs.
+
+MIN_SEGMENT_DAYS = int(os.getenv("REGIME_MIN_SEGMENT_DAYS", 30))
+PENALTY = float(os.getenv("REGIME_PENALTY", 3.0))
+# Divergence segments whose mean is within this band of 0 count as aligned
+NEUTRAL_BAND = float(os.getenv("REGIME_NEUTRAL_BAND", 0.1))
+
+# (query, params) whose result changes whenever a series' input does
+INPUT_VERSIONS = {
+    'divergence': ("SELECT COUNT(*), MAX(updated_at) FROM daily_sentiment", None),
+    'usdcad': ("SELECT COUNT(*), MAX(price_date), SUM(close) FROM fx_prices WHERE symbol = %s", (FX_SYMBOL,)),
+}
+
+
+def pelt(cost, n, penalty, min_size):
+    """
+    Change points of a length-n series minimizing sum(cost(s, t)) + penalty
+    per segment, segments at least min_size long. cost(starts, t) scores the
+    segments [starts, t) for an array of starts. Returns segment end indices.
+    """
+    if n < 2 * min_size:
+        return [n]
+
+    best = np.full(n + 1, np.inf)
+    best[0] = -penalty
+    previous = np.zeros(n + 1, dtype=int)
+    candidates = np.array([], dtype=int)
+    # Starts pruned at t, to drop once t itself becomes a legal start (t + min_size)
+    pruned = {}
+
+    for t in range(min_size, n + 1):
+        if t in pruned:
+            candidates = candidates[~np.isin(candidates, pruned.pop(t))]
+        # t - min_size just became a legal start; it's only reachable if a segmentation ends there
+        if np.isfinite(best[t - min_size]):
+            candidates = np.append(candidates, t - min_size)
+        totals = best[candidates] + cost(candidates, t)
+        i = int(np.argmin(totals))
+        best[t] = totals[i] + penalty
+        previous[t] = candidates[i]
+        # A start that already loses to ending a segment at t can never beat splitting at t,
+        # but only from the point where a segment may start at t
+        losers = candidates[totals > best[t]]
+        if len(losers):
+            pruned[t + min_size] = losers
+
+    ends = [n]
+    while previous[ends[-1]] > 0:
+        ends.append(previous[ends[-1]])
+    return ends[::-1]
+
+
+def mean_shift_cost(values):
+    """Squared error around each segment's mean: a Gaussian mean-change model."""
+    s1 = np.concatenate([[0.0], np.cumsum(values)])
+    s2 = np.concatenate([[0.0], np.cumsum(values * values)])
+
+    def cost(starts, t):
+        n = t - starts
+        return (s2[t] - s2[starts]) - (s1[t] - s1[starts]) ** 2 / n
+    return cost
+
+
+def variance_shift_cost(values):
+    """Negative log-likelihood of zero-mean Gaussian segments: a volatility-change model."""
+    s2 = np.concatenate([[0.0], np.cumsum(values * values)])
+    floor = max(float(np.mean(values * values)) * 1e-6, 1e-18)
+
+    def cost(starts, t):
+        n = t - starts
+        return n * np.log(np.maximum((s2[t] - s2[starts]) / n, floor))
+    return cost
+
+
+def segments(days, values, ends, label):
+    rows = []
+    start = 0
+    for end in ends:
+        chunk = values[start:end]
+        rows.append({
+            'start': days[start],
+            'end': days[end - 1],
+            'observations': int(end - start),
+            'mean': float(chunk.mean()),
+            'std': float(chunk.std()),
+            'label': label(chunk),
+        })
+        start = end
+    return rows
+
+
+def divergence_regimes(days, divergence):
+    n = len(divergence)
+    if n == 0:
+        return []
+    # BIC-style penalty in squared-error units. Ffilled releases leave most daily
+    # changes at 0, so the scale is the series' own variance, not the day-to-day noise.
+    penalty = PENALTY * float(np.var(divergence)) * np.log(n)
+    ends = pelt(mean_shift_cost(divergence), n, max(penalty, 1e-12), MIN_SEGMENT_DAYS)
+
+    def label(chunk):
+        mean = chunk.mean()
+        if mean > NEUTRAL_BAND:
+            return 'fed_more_hawkish'
+        if mean < -NEUTRAL_BAND:
+            return 'boc_more_hawkish'
+        return 'aligned'
+    return segments(days, divergence, ends, label)
+
+
+def usdcad_regimes(price_days, prices):
+    if len(prices) < 2:
+        return []
+    returns = np.diff(np.log(prices))
+    # Trading days rather than calendar days, roughly the same span
+    min_size = max(2, MIN_SEGMENT_DAYS * 5 // 7)
+    ends = pelt(variance_shift_cost(returns), len(returns), PENALTY * np.log(len(returns)), min_size)
+    typical = returns.std()
+
+    def label(chunk):
+        return 'high_volatility' if chunk.std() > typical else 'low_volatility'
+    return segments(price_days[1:], returns, ends, label)
+
+
+def load_divergence(conn):
+    df = pd.read_sql("SELECT publish_date as date, bank_name, sentiment, weighted_sentiment, sentence_count FROM daily_sentiment", conn)
+    days, _, _, divergence = SentimentMatrix(df).divergence('plain', freq='daily')
+    return days, divergence
+
+
+def load_usdcad(conn):
+    df = pd.read_sql("SELECT price_date, close FROM fx_prices WHERE symbol = %s ORDER BY price_date",
+                     conn, params=(FX_SYMBOL,))
+    return df['price_date'].to_numpy().astype('datetime64[D]'), df['close'].to_numpy(dtype=float)
+
+
+DETECTORS = {
+    'divergence': lambda conn: divergence_regimes(*load_divergence(conn)),
+    'usdcad': lambda conn: usdcad_regimes(*load_usdcad(conn)),
+}
+
+
+def input_version(cur, series):
+    cur.execute(*INPUT_VERSIONS[series])
+    inputs = '|'.join(str(v) for v in cur.fetchone())
+    return f"{inputs}|{MIN_SEGMENT_DAYS}|{PENALTY}|{NEUTRAL_BAND}"
+
+
+def store_segments(cur, series, version, rows):
+    cur.execute("DELETE FROM regime_segments WHERE series = %s;", (series,))
+    if rows:
+        execute_values(cur, """
+            INSERT INTO regime_segments (series, segment_start, segment_end, observations, mean, std, label)
+            VALUES %s;
+        """, [(series, str(r['start']), str(r['end']), r['observations'], r['mean'], r['std'], r['label']) for r in rows])
+    cur.execute("""
+        INSERT INTO regime_runs (series, input_version, segment_count, computed_at)
+        VALUES (%s, %s, %s, now())
+        ON CONFLICT (series) DO UPDATE
+        SET input_version = EXCLUDED.input_version, segment_count = EXCLUDED.segment_count, computed_at = now();
+    """, (series, version, len(rows)))
+
+
+def refresh_regimes(conn):
+    """Recomputes the series whose inputs changed since their last run. Returns {series: segment count}."""
+    refreshed = {}
+    for series, detect in DETECTORS.items():
+        with conn.cursor() as cur:
+            version = input_version(cur, series)
+            cur.execute("SELECT input_version FROM regime_runs WHERE series = %s;", (series,))
+            row = cur.fetchone()
+        if row and row[0] == version:
+            continue
+
+        rows = detect(conn)
+        with conn.cursor() as cur:
+            store_segments(cur, series, version, rows)
+        conn.commit()
+        refreshed[series] = len(rows)
+    return refreshed
+
+
+if __name__ == "__main__":
+    connection = psycopg2.connect(os.getenv("DATABASE_URL"))
+    try:
+        refreshed = refresh_regimes(connection)
+        if not refreshed:
+            print("Regimes are up to date.")
+        for series, count in refreshed.items():
+            print(f"Stored {count} {series} regimes.")
+    except Exception as e:
+        print(f"Regime detection error: {e}")
+    finally:
+        connection.close()
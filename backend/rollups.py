@@ -0,0 +1,135 @@
+# Maintains the rollup tables the read endpoints serve, at write time:
+#   transcript_scores - one summary row per scored transcript
+#   daily_sentiment   - per-day, per-bank plain and impact-weighted averages for /api/divergence
+# Only the transcripts (and dates) touched by a scoring run are recomputed.
+
+TRANSCRIPT_SCORES_UPSERT = """
+    WITH per_topic AS (
+        SELECT
+            transcript_id,
+            COALESCE(NULLIF(topic, ''), 'Unknown') AS topic,
+            COUNT(*) AS n,
+            AVG(stance_score) AS mean,
+            SUM(stance_score * impact_weight) AS weighted_sum,
+            SUM(impact_weight) AS weight_sum
+        FROM transcript_sentences
+        {where}
+        GROUP BY 1, 2
+    )
+    INSERT INTO transcript_scores
+        (transcript_id, bank_name, publish_date, sentence_count, mean_score,
+         weighted_score, weight_sum, topic_breakdown, updated_at)
+    SELECT
+        t.id,
+        t.bank_name,
+        t.publish_date,
+        SUM(p.n),
+        SUM(p.mean * p.n) / SUM(p.n),
+        SUM(p.weighted_sum) / NULLIF(SUM(p.weight_sum), 0),
+        SUM(p.weight_sum),
+        jsonb_object_agg(p.topic, jsonb_build_object(
+            'count', p.n,
+            'mean', p.mean,
+            'weighted', p.weighted_sum / NULLIF(p.weight_sum, 0)
+        )),
+        now()
+    FROM per_topic p
+    JOIN transcripts t ON t.id = p.transcript_id
+    GROUP BY t.id, t.bank_name, t.publish_date
+    ON CONFLICT (transcript_id) DO UPDATE
+    SET bank_name = EXCLUDED.bank_name,
+        publish_date = EXCLUDED.publish_date,
+        sentence_count = EXCLUDED.sentence_count,
+        mean_score = EXCLUDED.mean_score,
+        weighted_score = EXCLUDED.weighted_score,
+        weight_sum = EXCLUDED.weight_sum,
+        topic_breakdown = EXCLUDED.topic_breakdown,
+        updated_at = EXCLUDED.updated_at;
+"""
+
+# Sentence-weighted mean of the transcript means equals the plain average over all sentences
+DAILY_SENTIMENT_UPSERT = """
+    INSERT INTO daily_sentiment
+        (publish_date, bank_name, sentiment, weighted_sentiment, sentence_count, weight_sum, updated_at)
+    SELECT
+        publish_date,
+        bank_name,
+        SUM(mean_score * sentence_count) / SUM(sentence_count),
+        SUM(weighted_score * weight_sum) / NULLIF(SUM(weight_sum), 0),
+        SUM(sentence_count),
+        SUM(weight_sum),
+        now()
+    FROM transcript_scores
+    {where}
+    GROUP BY publish_date, bank_name
+    ON CONFLICT (publish_date, bank_name) DO UPDATE
+    SET sentiment = EXCLUDED.sentiment,
+        weighted_sentiment = EXCLUDED.weighted_sentiment,
+        sentence_count = EXCLUDED.sentence_count,
+        weight_sum = EXCLUDED.weight_sum,
+        updated_at = EXCLUDED.updated_at;
+"""
+
+
+def refresh_transcript_scores(cur, transcript_ids=None):
+    """
+    Recomputes transcript_scores for the given transcripts, or for every
+    scored transcript when transcript_ids is None.
+    """
+    if transcript_ids is None:
+        cur.execute(TRANSCRIPT_SCORES_UPSERT.format(where=""))
+        return
+
+    if not transcript_ids:
+        return
+
+    cur.execute(
+        TRANSCRIPT_SCORES_UPSERT.format(where="WHERE transcript_id = ANY(%s)"),
+        (list(transcript_ids),),
+    )
+
+
+def refresh_daily_sentiment(cur, transcript_ids=None):
+    """
+    Recomputes daily_sentiment for the publish dates of the given transcripts,
+    or for every date when transcript_ids is None. Run after
+    refresh_transcript_scores, which it reads from.
+    """
+    if transcript_ids is None:
+        cur.execute(DAILY_SENTIMENT_UPSERT.format(where=""))
+        return
+
+    if not transcript_ids:
+        return
+
+    where = """
+        WHERE (publish_date, bank_name) IN (
+            SELECT publish_date, bank_name FROM transcripts WHERE id = ANY(%s)
+        )
+    """
+    cur.execute(DAILY_SENTIMENT_UPSERT.format(where=where), (list(transcript_ids),))
+
+
+def refresh_rollups(cur, transcript_ids=None):
+    # Parallel scoring workers serialize here until commit, so each daily
+    # upsert sees transcripts other workers committed for the same day
+    cur.execute("SELECT pg_advisory_xact_lock(hashtext('rollups'));")
+    refresh_transcript_scores(cur, transcript_ids)
+    refresh_daily_sentiment(cur, transcript_ids)
+
+
+def ensure_rollups(cur):
+    """Builds the rollup tables from scratch the first time they are empty."""
+    cur.execute("SELECT 1 FROM transcript_scores LIMIT 1;")
+    if cur.fetchone() is None:
+        print("transcript_scores is empty, rebuilding from transcript_sentences")
+        refresh_rollups(cur)
+        return
+
+    # Rows written before weight_sum existed need the impact-weighted columns filled in
+    cur.execute("SELECT 1 FROM daily_sentiment WHERE weight_sum IS NULL LIMIT 1;")
+    missing_weights = cur.fetchone() is not None
+    cur.execute("SELECT 1 FROM daily_sentiment LIMIT 1;")
+    if missing_weights or cur.fetchone() is None:
+        print("daily_sentiment is empty or outdated, rebuilding from transcript_scores")
+        refresh_daily_sentiment(cur)
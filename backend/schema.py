@@ -0,0 +1,177 @@
+import os
+import psycopg2
+from dotenv import load_dotenv
+from search import SENTENCE_VECTOR, TRANSCRIPT_VECTOR
+
+load_dotenv()
+
+# Idempotent DDL for the derived tables the pipeline maintains on top of
+# transcripts / transcript_sentences. Safe to run on every deploy.
+SCHEMA = [
+    "CREATE INDEX IF NOT EXISTS transcripts_publish_date_id_idx ON transcripts (publish_date DESC, id DESC);",
+    "CREATE INDEX IF NOT EXISTS transcript_sentences_transcript_id_idx ON transcript_sentences (transcript_id);",
+    """
+    CREATE TABLE IF NOT EXISTS transcript_scores (
+        transcript_id INTEGER PRIMARY KEY REFERENCES transcripts (id) ON DELETE CASCADE,
+        bank_name TEXT NOT NULL,
+        publish_date DATE NOT NULL,
+        sentence_count INTEGER NOT NULL,
+        mean_score DOUBLE PRECISION,
+        weighted_score DOUBLE PRECISION,
+        weight_sum DOUBLE PRECISION,
+        topic_breakdown JSONB NOT NULL DEFAULT '{}'::jsonb,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS transcript_scores_date_bank_idx ON transcript_scores (publish_date, bank_name);",
+    """
+    CREATE TABLE IF NOT EXISTS daily_sentiment (
+        publish_date DATE NOT NULL,
+        bank_name TEXT NOT NULL,
+        sentiment DOUBLE PRECISION,
+        sentence_count INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        PRIMARY KEY (publish_date, bank_name)
+    );
+    """,
+    "ALTER TABLE daily_sentiment ADD COLUMN IF NOT EXISTS weighted_sentiment DOUBLE PRECISION;",
+    "ALTER TABLE daily_sentiment ADD COLUMN IF NOT EXISTS weight_sum DOUBLE PRECISION;",
+    """
+    CREATE TABLE IF NOT EXISTS fx_prices (
+        symbol TEXT NOT NULL,
+        price_date DATE NOT NULL,
+        close DOUBLE PRECISION NOT NULL,
+        PRIMARY KEY (symbol, price_date)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS analysis_cache (
+        cache_key TEXT PRIMARY KEY,
+        model TEXT NOT NULL,
+        prompt_version TEXT NOT NULL,
+        result JSONB NOT NULL,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        last_used_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS analysis_cache_last_used_idx ON analysis_cache (last_used_at);",
+    """
+    CREATE TABLE IF NOT EXISTS http_cache (
+        url TEXT PRIMARY KEY,
+        etag TEXT,
+        last_modified TEXT,
+        content_hash TEXT NOT NULL,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS pdf_text_cache (
+        url TEXT PRIMARY KEY,
+        content_hash TEXT NOT NULL,
+        etag TEXT,
+        last_modified TEXT,
+        page_count INTEGER NOT NULL,
+        text TEXT NOT NULL,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS backfill_partitions (
+        id SERIAL PRIMARY KEY,
+        bank_name TEXT NOT NULL,
+        range_start DATE NOT NULL,
+        range_end DATE NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        checkpoint TEXT,
+        worker TEXT,
+        leased_until TIMESTAMPTZ,
+        saved INTEGER NOT NULL DEFAULT 0,
+        failed INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        UNIQUE (bank_name, range_start, range_end)
+    );
+    """,
+    # One row per transcript; batch_processor claims work from here. For a
+    # pending row, leased_until holds the retry backoff instead of a lease.
+    """
+    CREATE TABLE IF NOT EXISTS scoring_queue (
+        transcript_id INTEGER PRIMARY KEY REFERENCES transcripts (id) ON DELETE CASCADE,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        leased_until TIMESTAMPTZ,
+        worker TEXT,
+        last_error TEXT,
+        enqueued_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS scoring_queue_claimable_idx ON scoring_queue (enqueued_at, transcript_id) WHERE status IN ('pending', 'running');",
+    """
+    CREATE TABLE IF NOT EXISTS regime_segments (
+        series TEXT NOT NULL,
+        segment_start DATE NOT NULL,
+        segment_end DATE NOT NULL,
+        observations INTEGER NOT NULL,
+        mean DOUBLE PRECISION,
+        std DOUBLE PRECISION,
+        label TEXT NOT NULL,
+        PRIMARY KEY (series, segment_start)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS regime_runs (
+        series TEXT PRIMARY KEY,
+        input_version TEXT NOT NULL,
+        segment_count INTEGER NOT NULL,
+        computed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+    """,
+    # Full-text search (search.py). Adding a stored column rewrites the table once, on first deploy.
+    f"ALTER TABLE transcript_sentences ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ({SENTENCE_VECTOR}) STORED;",
+    f"ALTER TABLE transcripts ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ({TRANSCRIPT_VECTOR}) STORED;",
+]
+
+
+# Indexes on the big tables are built CONCURRENTLY so the scrapers and the
+# scorer keep writing while they build, as {name: definition}.
+CONCURRENT_INDEXES = {
+    "transcript_sentences_search_idx": "ON transcript_sentences USING GIN (search_vector)",
+    "transcripts_search_idx": "ON transcripts USING GIN (search_vector)",
+    "transcript_sentences_topic_score_idx": "ON transcript_sentences (topic, stance_score)",
+}
+
+
+def ensure_concurrent_indexes(conn):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction block
+    autocommit = conn.autocommit
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            for name, definition in CONCURRENT_INDEXES.items():
+                # A concurrent build that was interrupted leaves an invalid index that IF NOT EXISTS would keep
+                cur.execute("""
+                    SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                    WHERE c.relname = %s AND NOT i.indisvalid;
+                """, (name,))
+                if cur.fetchone():
+                    cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name};")
+                cur.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition};")
+    finally:
+        conn.autocommit = autocommit
+
+
+def ensure_schema(conn):
+    with conn.cursor() as cur:
+        for statement in SCHEMA:
+            cur.execute(statement)
+    conn.commit()
+    ensure_concurrent_indexes(conn)
+
+
+if __name__ == "__main__":
+    connection = psycopg2.connect(os.getenv("DATABASE_URL"))
+    try:
+        ensure_schema(connection)
+        print("Schema is up to date.")
+    finally:
+        connection.close()
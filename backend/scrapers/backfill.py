@@ -0,0 +1,167 @@
+import os
+import socket
+import argparse
+import datetime
+import psycopg2
+from dotenv import load_dotenv
+from http_pool import FetchPool
+from boc_scraper import BoCScraper
+from fed_scraper import FedScraper
+
+load_dotenv()
+
+# Historical backfill, split into date-range partitions stored in
+# backfill_partitions. Any number of workers can run the same command: each
+# claims a free partition with SKIP LOCKED, checkpoints after every batch, and
+# a partition whose worker died is picked up again once its lease expires.
+# A batch with failed fetches hands the partition back as pending without
+# checkpointing past it, so it is only marked done once everything was saved.
+#
+#   python backfill.py --bank fed --start 2010-01-01 --end 2021-07-29 --worker a
+#   python backfill.py --status
+
+SCRAPERS = {'boc': BoCScraper, 'fed': FedScraper}
+LEASE_MINUTES = int(os.getenv("BACKFILL_LEASE_MINUTES", 30))
+
+
+def month_ranges(start, end, months):
+    """Consecutive [start, end] date ranges of `months` calendar months, newest first."""
+    ranges = []
+    current = datetime.date(start.year, start.month, 1)
+    while current <= end:
+        month_index = current.month - 1 + months
+        following = datetime.date(current.year + month_index // 12, month_index % 12 + 1, 1)
+        ranges.append((max(current, start), min(following - datetime.timedelta(days=1), end)))
+        current = following
+    return ranges[::-1]
+
+
+def plan(conn, bank_name, start, end, months):
+    """Creates the partitions for a range; re-running with the same arguments is a no-op."""
+    with conn.cursor() as cur:
+        for range_start, range_end in month_ranges(start, end, months):
+            cur.execute("""
+                INSERT INTO backfill_partitions (bank_name, range_start, range_end)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (bank_name, range_start, range_end) DO NOTHING;
+            """, (bank_name, range_start, range_end))
+    conn.commit()
+
+
+def claim(conn, bank_name, worker):
+    """Leases the newest pending (or abandoned) partition. Returns (id, start, end, checkpoint) or None."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE backfill_partitions
+            SET status = 'running', worker = %s, leased_until = now() + %s * interval '1 minute', updated_at = now()
+            WHERE id = (
+                SELECT id FROM backfill_partitions
+                WHERE bank_name = %s
+                  AND (status = 'pending' OR (status = 'running' AND leased_until < now()))
+                ORDER BY range_start DESC
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, range_start, range_end, checkpoint;
+        """, (worker, LEASE_MINUTES, bank_name))
+        row = cur.fetchone()
+    conn.commit()
+    return row
+
+
+def save_checkpoint(conn, partition_id, checkpoint, saved, failed):
+    """Records progress and renews the lease."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE backfill_partitions
+            SET checkpoint = %s, saved = saved + %s, failed = failed + %s,
+                leased_until = now() + %s * interval '1 minute', updated_at = now()
+            WHERE id = %s;
+        """, (checkpoint, saved, failed, LEASE_MINUTES, partition_id))
+    conn.commit()
+
+
+def set_status(conn, partition_id, status):
+    with conn.cursor() as cur:
+        cur.execute("""
+            UPDATE backfill_partitions
+            SET status = %s, leased_until = NULL, updated_at = now()
+            WHERE id = %s;
+        """, (status, partition_id))
+    conn.commit()
+
+
+def work(conn, scraper, worker):
+    """Processes partitions for the scraper's bank until none are left to claim."""
+    bank_name = scraper.bank_name
+    while True:
+        partition = claim(conn, bank_name, worker)
+        if partition is None:
+            print(f"No {bank_name} partitions left to claim.")
+            return
+
+        partition_id, range_start, range_end, checkpoint = partition
+        resumed = f" from checkpoint {checkpoint}" if checkpoint else ""
+        print(f"[{worker}] {bank_name} {range_start} to {range_end}{resumed}")
+
+        def on_batch(new_checkpoint, saved, failed):
+            save_checkpoint(conn, partition_id, new_checkpoint, saved, failed)
+            print(f"[{worker}] {bank_name} {range_start} to {range_end}: checkpoint {new_checkpoint}, {saved} saved")
+
+        try:
+            scraper.backfill(range_start, range_end, checkpoint, on_batch)
+            set_status(conn, partition_id, 'done')
+        except Exception as e:
+            # Hand the partition back so another worker resumes it from the last checkpoint
+            print(f"Backfill error for {bank_name} {range_start} to {range_end}: {e}")
+            conn.rollback()
+            set_status(conn, partition_id, 'pending')
+            return
+
+
+def print_status(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT bank_name, status, COUNT(*), SUM(saved), SUM(failed), MIN(range_start), MAX(range_end)
+            FROM backfill_partitions
+            GROUP BY bank_name, status
+            ORDER BY bank_name, status;
+        """)
+        for bank_name, status, count, saved, failed, first, last in cur.fetchall():
+            print(f"{bank_name:4} {status:8} {count:4} partitions {first} to {last}: {saved} saved, {failed} failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumable historical backfill for the bank scrapers")
+    parser.add_argument("--bank", choices=SCRAPERS)
+    parser.add_argument("--start", type=datetime.date.fromisoformat)
+    parser.add_argument("--end", type=datetime.date.fromisoformat, default=datetime.date.today())
+    parser.add_argument("--months", type=int, default=int(os.getenv("BACKFILL_PARTITION_MONTHS", 6)),
+                        help="partition size in calendar months")
+    parser.add_argument("--worker", default=f"{socket.gethostname()}-{os.getpid()}")
+    parser.add_argument("--status", action="store_true", help="print partition progress and exit")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(os.getenv("DATABASE_URL"))
+    try:
+        if args.status:
+            print_status(conn)
+            return
+        if not args.bank:
+            parser.error("--bank is required")
+        fetch_pool = FetchPool()
+        scraper = SCRAPERS[args.bank](fetch_pool=fetch_pool)
+        try:
+            # Without --start, just help with partitions someone else planned
+            if args.start:
+                plan(conn, scraper.bank_name, args.start, args.end, args.months)
+            work(conn, scraper, args.worker)
+        finally:
+            scraper.close()
+            fetch_pool.close()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
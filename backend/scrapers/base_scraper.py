@@ -1,14 +1,52 @@
 import os
 import re
+import hashlib
 import unicodedata
+import threading
 import psycopg2
+from psycopg2.extras import execute_values
 from dotenv import load_dotenv
+from http_pool import FetchPool
 
 load_dotenv()
 
+# Control characters, NBSP and zero-width space all become plain spaces
+_CONTROL = re.compile(r'[\x00-\x1F\x7F-\x9F\xa0\u200b]')
+# Runs of rule characters (---, ***, ##). The class catches mixed runs too, so
+# _RULES re-splits each hit; real runs are rare, which keeps the callback cheap.
+_RULE_RUN = re.compile(r'[-–—_*#]{2,}')
+_RULES = re.compile(r'[-–—]{2,}|[_*#]{2,}')
+
+
+def _split_rules(match):
+    return _RULES.sub(' ', match.group())
+
+
+def clean_text(text):
+    """NFKC-normalizes text and collapses whitespace and separator runs to single spaces."""
+    if not text:
+        return ""
+    # ASCII is already NFKC, and the check is far cheaper than the normalization
+    if not text.isascii():
+        text = unicodedata.normalize('NFKC', text)
+    text = _RULE_RUN.sub(_split_rules, _CONTROL.sub(' ', text))
+    # str.split() uses the same whitespace definition as \s, and strips as it collapses
+    return ' '.join(text.split())
+
+
+def clean_texts(texts):
+    """clean_text over a stream of documents, e.g. when re-ingesting the archive."""
+    for text in texts:
+        yield clean_text(text)
+
+
 class CentralBankScraper:
-    def __init__(self, bank_name):
+    def __init__(self, bank_name, fetch_pool=None):
         self.bank_name = bank_name
+        self.owns_pool = fetch_pool is None
+        self.fetch_pool = fetch_pool or FetchPool()
+        # psycopg2 cursors are not thread-safe; fetch workers share this one
+        self.db_lock = threading.Lock()
 
         db_url = os.getenv("DATABASE_URL")
         
@@ -20,56 +58,151 @@ class CentralBankScraper:
             print(f"Connection Error: {e}")
             raise
 
-    def clean_text(self, text):
-        if not text:
-            return ""
-        
-        text = unicodedata.normalize('NFKC', text)
-        text = re.sub(r'[\x00-\x1F\x7F-\x9F]', ' ', text)
-        text = text.replace('\xa0', ' ').replace('\u200b', ' ')
-        text = re.sub(r'[-–—]{2,}', ' ', text)
-        text = re.sub(r'[_*#]{2,}', ' ', text)
-        text = re.sub(r'\s+', ' ', text)
-        
-        return text.strip()
+        # Rows are buffered by save_to_db and written in one transaction by flush()
+        self.pending = []
+        self.known_urls = self.load_known_urls()
 
-    # Saves scraped content to the Neon database
-    def save_to_db(self, date, url, text):
-        """
-        Saves the scraped text to the 'transcripts' table.
-        """
+    def load_known_urls(self):
+        """Preloads every stored URL for this bank so url_exists never hits the DB."""
         try:
-            cleaned = self.clean_text(text)
-            
-            if len(cleaned) < 100:
-                print(f"Text too short, skipping.")
-                return
-            
-            query = """
-            INSERT INTO transcripts (bank_name, publish_date, content, url)
-            VALUES (%s, %s, %s, %s)
-            ON CONFLICT (url) DO NOTHING;
-            """
-            self.cursor.execute(query, (self.bank_name, date, cleaned, url))
+            self.cursor.execute("SELECT url FROM transcripts WHERE bank_name = %s;", (self.bank_name,))
+            urls = {row[0] for row in self.cursor.fetchall()}
             self.conn.commit()
-            print(f"Saved {self.bank_name} transcript for {date}")
-            
+            return urls
         except Exception as e:
-            print(f"DB error: {e}")
+            print(f"Could not preload known URLs: {e}")
             self.conn.rollback()
+            return set()
+
+    def clean_text(self, text):
+        return clean_text(text)
+
+    # Queues scraped content for the Neon database; flush() writes it
+    def save_to_db(self, date, url, text):
+        """
+        Buffers the scraped text for the 'transcripts' table.
+        """
+        cleaned = self.clean_text(text)
+
+        if len(cleaned) < 100:
+            print(f"Text too short, skipping.")
+            return
+
+        with self.db_lock:
+            self.pending.append((self.bank_name, date, cleaned, url))
+            self.known_urls.add(url)
+        print(f"Queued {self.bank_name} transcript for {date}")
+
+    def flush(self) -> bool:
+        """Inserts all buffered transcripts in one transaction. Returns False if the insert failed."""
+        with self.db_lock:
+            if not self.pending:
+                return True
+            try:
+                query = """
+                INSERT INTO transcripts (bank_name, publish_date, content, url)
+                VALUES %s
+                ON CONFLICT (url) DO NOTHING;
+                """
+                execute_values(self.cursor, query, self.pending)
+                self.conn.commit()
+                print(f"Saved {len(self.pending)} {self.bank_name} transcripts")
+                self.pending = []
+                return True
+
+            except Exception as e:
+                print(f"DB error: {e}")
+                self.conn.rollback()
+                return False
 
     def url_exists(self, url: str) -> bool:
-        """Return True if the given URL already exists in the transcripts table."""
+        """Return True if the given URL is already stored or queued for this bank."""
+        with self.db_lock:
+            return url in self.known_urls
+
+    def filter_new_urls(self, urls):
+        """Returns the URLs not yet in the transcripts table (any bank), in one round trip."""
+        urls = [u for u in urls if not self.url_exists(u)]
+        if not urls:
+            return []
+        with self.db_lock:
+            try:
+                self.cursor.execute("SELECT url FROM transcripts WHERE url = ANY(%s);", (urls,))
+                existing = {row[0] for row in self.cursor.fetchall()}
+                self.conn.commit()
+            except Exception as e:
+                # On error, conservatively treat everything as new so scraping proceeds
+                print(f"DB check error for filter_new_urls: {e}")
+                self.conn.rollback()
+                return urls
+        return [u for u in urls if u not in existing]
+
+    def fetch_if_changed(self, url, timeout=15):
+        """
+        Conditional GET against the validators stored in http_cache.
+        Returns the response, or None when the server answers 304 or the body
+        hashes the same as last time. Call remember_validators() only once
+        everything linked from the response was fetched, or articles that
+        failed this run would never be retried.
+        """
+        cached = None
         try:
-            q = "SELECT 1 FROM transcripts WHERE url = %s LIMIT 1;"
-            self.cursor.execute(q, (url,))
-            return self.cursor.fetchone() is not None
+            with self.db_lock:
+                self.cursor.execute(
+                    "SELECT etag, last_modified, content_hash FROM http_cache WHERE url = %s;", (url,)
+                )
+                cached = self.cursor.fetchone()
         except Exception as e:
-            # On error, conservatively return False so scraping proceeds
-            print(f"DB check error for url_exists({url}): {e}")
-            return False
+            print(f"HTTP cache lookup error for {url}: {e}")
+            self.conn.rollback()
+
+        headers = {}
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        r = self.fetch_pool.get(url, timeout=timeout, headers=headers)
+        if r.status_code == 304:
+            print(f"Not modified: {url}")
+            return None
+        r.raise_for_status()
+
+        if cached and cached[2] == hashlib.sha256(r.content).hexdigest():
+            print(f"Unchanged: {url}")
+            return None
+        return r
+
+    def remember_validators(self, url, response):
+        query = """
+        INSERT INTO http_cache (url, etag, last_modified, content_hash, updated_at)
+        VALUES (%s, %s, %s, %s, now())
+        ON CONFLICT (url) DO UPDATE
+        SET etag = EXCLUDED.etag,
+            last_modified = EXCLUDED.last_modified,
+            content_hash = EXCLUDED.content_hash,
+            updated_at = EXCLUDED.updated_at;
+        """
+        with self.db_lock:
+            try:
+                self.cursor.execute(query, (
+                    url,
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified'),
+                    hashlib.sha256(response.content).hexdigest(),
+                ))
+                self.conn.commit()
+            except Exception as e:
+                print(f"HTTP cache write error: {e}")
+                self.conn.rollback()
 
     def close(self):
+        if self.pending:
+            self.flush()
+        if self.owns_pool:
+            self.fetch_pool.close()
         if self.cursor:
             self.cursor.close()
         if self.conn:
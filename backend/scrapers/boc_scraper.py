@@ -1,22 +1,42 @@
-import requests
+import re
+import datetime
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from base_scraper import CentralBankScraper
 
+LISTING_URL = "https://www.bankofcanada.ca/press/press-releases/"
+KEYWORDS = ["interest rate", "monetary policy", "statement", "policy rate"]
+
+
+def listing_date(heading):
+    """Publication date shown next to a listing entry, if the markup has one."""
+    container = heading.parent or heading
+    tag = container.find('time') or container.find(class_=re.compile('date'))
+    if tag is None:
+        return None
+    raw = (tag.get('datetime') or tag.get_text(strip=True)).strip()
+    for value, fmt in ((raw[:10], '%Y-%m-%d'), (raw, '%B %d, %Y')):
+        try:
+            return datetime.datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
 class BoCScraper(CentralBankScraper):
-    def __init__(self):
-        super().__init__(bank_name="BoC")
+    def __init__(self, fetch_pool=None):
+        super().__init__(bank_name="BoC", fetch_pool=fetch_pool)
 
     def get_article_text(self, soup):
         # Remove junk
         for tag in soup(['script', 'style', 'nav', 'footer', 'header']):
             tag.decompose()
-        
+
         # Find content
         content = soup.find('div', class_='post-content')
         if not content:
             return ""
-        
+
         # Get paragraphs
         paras = []
         for p in content.find_all('p'):
@@ -26,66 +46,184 @@ class BoCScraper(CentralBankScraper):
 
         return ' '.join(paras)
 
-    def run(self): 
-        url = "https://www.bankofcanada.ca/press/press-releases/"
-        
-        try:
-            r = requests.get(url, timeout=10)
-            r.raise_for_status()
-        except Exception as err:
-            print(f"Error: {err}")
-            return
-        
-        soup = BeautifulSoup(r.text, 'html.parser')
-        articles = soup.find_all('h3', class_='media-heading')
-        
-        keywords = ["interest rate", "monetary policy", "statement", "policy rate"]
-        
-        for article in articles:
+    def fetch_article(self, article_url):
+        # Runs on a fetch worker: download and parse, leave the DB write to the caller
+        r = self.fetch_pool.get(article_url, timeout=15)
+        r.raise_for_status()
+
+        article_soup = BeautifulSoup(r.text, 'html.parser')
+
+        # Get date
+        date_meta = article_soup.find('meta', attrs={'name': 'publication_date'})
+        date = date_meta['content'][:10] if date_meta and date_meta.get('content') else '1970-01-01'
+
+        # Get text
+        return date, self.get_article_text(article_soup)
+
+    def listing_candidates(self, headings, page_url):
+        """Policy-related links from one listing page, as {url: title}."""
+        candidates = {}
+        for article in headings:
             link = article.find('a')
             if not link:
                 continue
-            
+
             title = link.get_text().strip()
-            if not any(k in title.lower() for k in keywords):
+            if not any(k in title.lower() for k in KEYWORDS):
                 continue
-            
-            article_url = urljoin(url, link['href'])
-            # Skip if already in DB
-            try:
-                if self.url_exists(article_url):
-                    continue
-            except Exception:
-                pass
 
-            print(f"Scraping: {title}")
+            candidates.setdefault(urljoin(page_url, link['href']), title)
+        return candidates
+
+    def scrape(self, candidates, start=None, end=None):
+        """
+        Fetches and saves the candidates not yet stored, keeping only articles
+        dated within [start, end] when given. Returns (saved, failures,
+        article_dates, flushed).
+        """
+        # Skip anything already in DB, checked in one query
+        new_urls = self.filter_new_urls(list(candidates))
+        for article_url in new_urls:
+            print(f"Scraping: {candidates[article_url]}")
+
+        saved = 0
+        failures = 0
+        dates = []
+        for article_url, result in self.fetch_pool.map(self.fetch_article, new_urls):
+            if result is None:
+                failures += 1
+                continue
 
+            date, text = result
             try:
-                r = requests.get(article_url, timeout=15)
-                r.raise_for_status()
-            except Exception as err:
-                print(f"Failed to fetch {article_url}: {err}")
+                published = datetime.date.fromisoformat(date)
+                dates.append(published)
+            except ValueError:
+                published = None
+            if published and ((start and published < start) or (end and published > end)):
                 continue
-            
-            article_soup = BeautifulSoup(r.text, 'html.parser')
-            
-            # Get date
-            date_meta = article_soup.find('meta', attrs={'name': 'publication_date'})
-            date = date_meta['content'][:10] if date_meta and date_meta.get('content') else '1970-01-01'
-            
-            # Get text
-            text = self.get_article_text(article_soup)
-            
             if len(text) < 200:
                 continue
-            
+
             self.save_to_db(date, article_url, text)
-        
+            saved += 1
+
+        return saved, failures, dates, self.flush()
+
+    def run(self):
+        url = LISTING_URL
+
+        try:
+            r = self.fetch_if_changed(url, timeout=10)
+        except Exception as err:
+            print(f"Error: {err}")
+            return
+
+        if r is None:
+            print("Listing unchanged since last run. Done.")
+            return
+
+        soup = BeautifulSoup(r.text, 'html.parser')
+        candidates = self.listing_candidates(soup.find_all('h3', class_='media-heading'), url)
+
+        _, failures, _, flushed = self.scrape(candidates)
+        if flushed and not failures:
+            self.remember_validators(url, r)
         print("Done.")
 
+    def listing_page(self, page):
+        """(page_url, headings) of an archive listing page; no headings past the last page."""
+        page_url = LISTING_URL if page == 1 else f"{LISTING_URL}?mt_page={page}"
+        r = self.fetch_pool.get(page_url, timeout=15)
+        if r.status_code == 404:
+            return page_url, []
+        r.raise_for_status()
+        return page_url, BeautifulSoup(r.text, 'html.parser').find_all('h3', class_='media-heading')
+
+    def first_page_for(self, end):
+        """
+        First listing page that can hold releases dated on or before end. The
+        archive is newest first, so galloping then bisecting on listing dates
+        takes O(log pages) fetches instead of walking every newer page.
+        Falls back to page 1 when the listing has no dates.
+        """
+        previous = None
+
+        def newer(page):
+            # Whether every release on the page is dated after end; past the last page counts as not
+            nonlocal previous
+            _, headings = self.listing_page(page)
+            titles = [h.get_text(strip=True) for h in headings]
+            # Past the last page the archive 404s, comes back empty or repeats itself
+            if not headings or titles == previous:
+                return False
+            previous = titles
+            dates = [d for d in (listing_date(h) for h in headings) if d]
+            return None if not dates else min(dates) > end
+
+        # Invariant: every page up to lo is newer than the range, hi is not
+        lo, hi = 0, 1
+        while True:
+            result = newer(hi)
+            if result is None:
+                return 1
+            if not result:
+                break
+            lo, hi = hi, hi * 2
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            previous = None
+            if newer(mid):
+                lo = mid
+            else:
+                hi = mid
+        return hi
+
+    def backfill(self, start, end, checkpoint, on_batch):
+        """
+        Walks the paginated press-release archive (newest first) for releases
+        dated within [start, end]. The checkpoint is the last listing page
+        fully processed; on_batch(checkpoint, saved, failed) runs after each page.
+        A page with failed articles raises without moving the checkpoint past it.
+        A fresh partition starts from the first page reaching back to end.
+        """
+        if checkpoint:
+            page = int(checkpoint) + 1
+        else:
+            page = self.first_page_for(end)
+            if page > 1:
+                on_batch(str(page - 1), 0, 0)
+        previous = None
+        while True:
+            page_url, headings = self.listing_page(page)
+            candidates = self.listing_candidates(headings, page_url)
+            # Past the last page the archive 404s, comes back empty or repeats itself
+            if not headings or (candidates and candidates == previous):
+                return
+            previous = candidates
+
+            page_dates = [d for d in (listing_date(h) for h in headings) if d]
+            # Listing dates, where the markup has them, spare fetching articles outside the range
+            if page_dates and (min(page_dates) > end or max(page_dates) < start):
+                saved, failures, dates = 0, 0, page_dates
+            else:
+                saved, failures, dates, flushed = self.scrape(candidates, start, end)
+                if not flushed:
+                    raise RuntimeError(f"Could not save BoC listing page {page}")
+                if failures:
+                    # Keep the checkpoint before this page so the failed articles are retried
+                    on_batch(str(page - 1), saved, failures)
+                    raise RuntimeError(f"{failures} BoC articles on listing page {page} failed")
+                dates = page_dates or dates
+
+            on_batch(str(page), saved, failures)
+            if dates and max(dates) < start:
+                return
+            page += 1
+
 if __name__ == "__main__":
     scraper = BoCScraper()
     try:
         scraper.run()
     finally:
-        scraper.close()
\ No newline at end of file
+        scraper.close()
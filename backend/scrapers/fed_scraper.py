@@ -1,19 +1,17 @@
 import os
 import re
-import io
 import json
-import requests
-import PyPDF2
 import datetime
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from base_scraper import CentralBankScraper
+from pdf_text import PdfExtractor, download
 
 class FedScraper(CentralBankScraper):
-    def __init__(self):
-        super().__init__(bank_name="Fed")
+    def __init__(self, fetch_pool=None):
+        super().__init__(bank_name="Fed", fetch_pool=fetch_pool)
         self.feed_url = "https://www.federalreserve.gov/json/ne-press.json"
-        self.session = requests.Session()
+        self.pdf_extractor = PdfExtractor()
 
         raw_cutoff = os.getenv('SCRAPER_EARLIEST_DATE', '2021-07-29')
         try:
@@ -21,26 +19,97 @@ class FedScraper(CentralBankScraper):
         except ValueError:
             self.cutoff = datetime.date(2024, 1, 1)
 
+    def cached_pdf(self, url):
+        """Returns (content_hash, etag, last_modified, text) from pdf_text_cache, or None."""
+        with self.db_lock:
+            try:
+                self.cursor.execute(
+                    "SELECT content_hash, etag, last_modified, text FROM pdf_text_cache WHERE url = %s;", (url,)
+                )
+                row = self.cursor.fetchone()
+                self.conn.commit()
+                return row
+            except Exception as e:
+                print(f"PDF cache lookup error for {url}: {e}")
+                self.conn.rollback()
+                return None
+
+    def store_pdf(self, url, response, content_hash, page_count, text):
+        query = """
+        INSERT INTO pdf_text_cache (url, content_hash, etag, last_modified, page_count, text, updated_at)
+        VALUES (%s, %s, %s, %s, %s, %s, now())
+        ON CONFLICT (url) DO UPDATE
+        SET content_hash = EXCLUDED.content_hash,
+            etag = EXCLUDED.etag,
+            last_modified = EXCLUDED.last_modified,
+            page_count = EXCLUDED.page_count,
+            text = EXCLUDED.text,
+            updated_at = EXCLUDED.updated_at;
+        """
+        with self.db_lock:
+            try:
+                self.cursor.execute(query, (
+                    url, content_hash, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                    page_count, text,
+                ))
+                self.conn.commit()
+            except Exception as e:
+                print(f"PDF cache write error: {e}")
+                self.conn.rollback()
+
     def get_pdf_text(self, url):
+        # Extracted text is cached per URL and content hash: a 304, or a body
+        # that hashes the same, reuses it without parsing the PDF again
+        cached = self.cached_pdf(url)
+        headers = {}
+        if cached:
+            _, etag, last_modified, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
         try:
-            resp = self.session.get(url, timeout=20)
-            resp.raise_for_status()
-            with io.BytesIO(resp.content) as f:
-                reader = PyPDF2.PdfReader(f)
-                return " ".join([page.extract_text() or "" for page in reader.pages]).strip()
+            resp, spool, content_hash = download(self.fetch_pool, url, timeout=20, headers=headers)
+            if spool is None:
+                return cached[3] if cached else None
+            with spool:
+                if cached and cached[0] == content_hash:
+                    return cached[3]
+                text, page_count = self.pdf_extractor.extract(spool)
         except Exception:
             return None
 
-    def run(self):
+        self.store_pdf(url, resp, content_hash, page_count, text)
+        return text
+
+    def fetch_content(self, full_url):
+        # Runs on a fetch worker: HTML page first, then its PDF if it links one
+        if full_url.endswith('.pdf'):
+            return self.get_pdf_text(full_url)
+
         try:
-            r = self.session.get(self.feed_url, timeout=15)
-            r.raise_for_status()
-            releases = json.loads(r.content.decode('utf-8-sig'))
-        except Exception as e:
-            print(f"Feed error: {e}")
-            return
+            page = self.fetch_pool.get(full_url, timeout=15)
+            page.raise_for_status()
+            soup = BeautifulSoup(page.text, 'html.parser')
+            pdf_btn = soup.find('a', href=re.compile(r'\.pdf$', re.I))
+            if pdf_btn:
+                pdf_url = urljoin(full_url, pdf_btn['href'])
+                # Avoid re-downloading if URL already exists
+                if not self.url_exists(pdf_url):
+                    return self.get_pdf_text(pdf_url)
+            else:
+                article = soup.find('div', id='article') or soup.find('div', class_='col-xs-12')
+                if article:
+                    return " ".join([p.get_text() for p in article.find_all('p') if len(p.get_text()) > 30])
+        except Exception:
+            return None
+        # Nothing to scrape here, as opposed to None for a failed fetch
+        return ""
 
-        processed = 0
+    def feed_candidates(self, releases, start, end=None):
+        """Policy statements and projections in the feed dated within [start, end], as {url: (title, date_str)}."""
+        candidates = {}
         for item in releases:
             title = (item.get('t') or item.get('title') or "").strip()
             path = item.get('l', '')
@@ -55,42 +124,89 @@ class FedScraper(CentralBankScraper):
             full_url = urljoin("https://www.federalreserve.gov", path)
             match = re.search(r'(\d{8})', path)
             if not match: continue
-                
+
             raw_d = match.group(1)
 
             date_str = f"{raw_d[:4]}-{raw_d[4:6]}-{raw_d[6:]}"
-            if datetime.datetime.strptime(date_str, '%Y-%m-%d').date() < self.cutoff: break
+            published = datetime.datetime.strptime(date_str, '%Y-%m-%d').date()
+            if published < start or (end and published > end): continue
 
-            if self.url_exists(full_url): continue
+            if full_url in candidates or self.url_exists(full_url): continue
 
+            candidates[full_url] = (title, date_str)
+        return candidates
+
+    def scrape(self, candidates):
+        """Fetches and saves the candidates not yet stored. Returns (processed, failures, flushed)."""
+        # Skip anything already in DB, checked in one query
+        new_urls = self.filter_new_urls(list(candidates))
+        for full_url in new_urls:
+            title, date_str = candidates[full_url]
             print(f"Found: {title} ({date_str})")
-            content = None
 
-            if full_url.endswith('.pdf'):
-                content = self.get_pdf_text(full_url)
-            else:
-                try:
-                    page = self.session.get(full_url, timeout=15)
-                    soup = BeautifulSoup(page.text, 'html.parser')
-                    pdf_btn = soup.find('a', href=re.compile(r'\.pdf$', re.I))
-                    if pdf_btn:
-                        pdf_url = urljoin(full_url, pdf_btn['href'])
-                        # Avoid re-downloading if URL already exists
-                        if not self.url_exists(pdf_url):
-                            content = self.get_pdf_text(pdf_url)
-                    else:
-                        article = soup.find('div', id='article') or soup.find('div', class_='col-xs-12')
-                        if article:
-                            content = " ".join([p.get_text() for p in article.find_all('p') if len(p.get_text()) > 30])
-                except Exception:
-                    continue
-
-            if content and len(content) > 300:
+        processed = 0
+        failures = 0
+        for full_url, content in self.fetch_pool.map(self.fetch_content, new_urls):
+            title, date_str = candidates[full_url]
+            if content is None:
+                failures += 1
+            elif len(content) > 300:
                 self.save_to_db(date_str, full_url, f"Type: {title}\n\n{content}")
                 processed += 1
 
+        return processed, failures, self.flush()
+
+    def load_feed(self, response):
+        return json.loads(response.content.decode('utf-8-sig'))
+
+    def run(self):
+        try:
+            r = self.fetch_if_changed(self.feed_url, timeout=15)
+            if r is None:
+                print("Feed unchanged since last run. Done.")
+                return
+            releases = self.load_feed(r)
+        except Exception as e:
+            print(f"Feed error: {e}")
+            return
+
+        processed, failures, flushed = self.scrape(self.feed_candidates(releases, self.cutoff))
+        if flushed and not failures:
+            self.remember_validators(self.feed_url, r)
         print(f"Done. Processed {processed} new items.")
 
+    def backfill(self, start, end, checkpoint, on_batch):
+        """
+        Scrapes feed releases dated within [start, end], newest first, in
+        batches of BACKFILL_BATCH_SIZE. The checkpoint is the oldest date in
+        the last saved batch; a resume starts again from that day, and URLs
+        already stored are skipped. A batch with failed fetches raises without
+        moving the checkpoint, so the partition is retried rather than done.
+        """
+        r = self.fetch_pool.get(self.feed_url, timeout=15)
+        r.raise_for_status()
+        if checkpoint:
+            end = min(end, datetime.date.fromisoformat(checkpoint))
+
+        candidates = self.feed_candidates(self.load_feed(r), start, end)
+        urls = sorted(candidates, key=lambda u: candidates[u][1], reverse=True)
+        batch_size = int(os.getenv("BACKFILL_BATCH_SIZE", 25))
+        for i in range(0, len(urls), batch_size):
+            batch = {u: candidates[u] for u in urls[i:i + batch_size]}
+            processed, failures, flushed = self.scrape(batch)
+            if not flushed:
+                raise RuntimeError(f"Could not save Fed releases before {candidates[urls[i]][1]}")
+            if failures:
+                # Keep the previous checkpoint so the failed releases are retried
+                on_batch(checkpoint, processed, failures)
+                raise RuntimeError(f"{failures} Fed releases before {candidates[urls[i]][1]} failed")
+            checkpoint = min(date_str for _, date_str in batch.values())
+            on_batch(checkpoint, processed, failures)
+
+    def close(self):
+        self.pdf_extractor.close()
+        super().close()
+
 if __name__ == "__main__":
     scraper = FedScraper()
     try:
@@ -0,0 +1,75 @@
+import os
+import time
+import threading
+import requests
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+USER_AGENT = "finSENT/1.0 (+https://fin-sent.vercel.app)"
+
+
+class FetchPool:
+    """
+    Bounded worker pool for article downloads. Every worker thread keeps its
+    own keep-alive session, and each host gets at most `per_host` requests in
+    flight with `min_interval` seconds between request starts.
+    """
+
+    def __init__(self, max_workers=None, per_host=None, min_interval=None):
+        self.max_workers = max_workers or int(os.getenv("SCRAPER_WORKERS", 8))
+        self.per_host = per_host or int(os.getenv("SCRAPER_PER_HOST", 2))
+        self.min_interval = min_interval if min_interval is not None else float(os.getenv("SCRAPER_MIN_INTERVAL", 0.25))
+
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scraper")
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.host_slots = {}
+        self.host_next_start = {}
+
+    def session(self):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers['User-Agent'] = USER_AGENT
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.per_host)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self.local.session = session
+        return session
+
+    def _host_slot(self, host):
+        with self.lock:
+            if host not in self.host_slots:
+                self.host_slots[host] = threading.BoundedSemaphore(self.per_host)
+                self.host_next_start[host] = 0.0
+            return self.host_slots[host]
+
+    def _wait_turn(self, host):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.host_next_start[host])
+            self.host_next_start[host] = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+    def get(self, url, timeout=15, **kwargs):
+        host = urlparse(url).netloc
+        slot = self._host_slot(host)
+        with slot:
+            self._wait_turn(host)
+            return self.session().get(url, timeout=timeout, **kwargs)
+
+    def map(self, fn, items):
+        """Runs fn over items on the pool, yielding (item, result) as each completes. Errors yield (item, None)."""
+        futures = {self.executor.submit(fn, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                yield item, future.result()
+            except Exception as e:
+                print(f"Fetch failed for {item}: {e}")
+                yield item, None
+
+    def close(self):
+        self.executor.shutdown(wait=True)
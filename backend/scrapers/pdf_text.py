@@ -0,0 +1,91 @@
+import os
+import shutil
+import hashlib
+import tempfile
+import threading
+import multiprocessing
+import PyPDF2
+from concurrent.futures import ProcessPoolExecutor
+
+# Downloads stay in memory up to this size, then spill to disk
+SPOOL_BYTES = int(os.getenv("PDF_SPOOL_BYTES", 8 * 1024 * 1024))
+CHUNK_BYTES = 64 * 1024
+# Documents shorter than this are parsed inline; process start-up isn't worth it
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 8))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", min(4, os.cpu_count() or 1)))
+
+
+def download(fetch_pool, url, timeout=20, headers=None):
+    """
+    Streams a PDF into a SpooledTemporaryFile, hashing it on the way.
+    Returns (response, spool, sha256), with spool None on a 304.
+    """
+    resp = fetch_pool.get(url, timeout=timeout, headers=headers or {}, stream=True)
+    try:
+        if resp.status_code == 304:
+            return resp, None, None
+        resp.raise_for_status()
+
+        digest = hashlib.sha256()
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+        for chunk in resp.iter_content(CHUNK_BYTES):
+            digest.update(chunk)
+            spool.write(chunk)
+        spool.seek(0)
+        return resp, spool, digest.hexdigest()
+    finally:
+        resp.close()
+
+
+def extract_range(path, start, stop):
+    """Process-pool worker: text of pages [start, stop) of the PDF at path."""
+    with open(path, 'rb') as f:
+        reader = PyPDF2.PdfReader(f)
+        return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+class PdfExtractor:
+    """
+    Extracts PDF text page by page. Long documents are split into page ranges
+    and parsed across a process pool, each worker reading the same temp file.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or PDF_WORKERS
+        self.executor = None
+        # Scraper threads extract concurrently; without it two could each start a pool
+        self.lock = threading.Lock()
+
+    def pool(self):
+        with self.lock:
+            if self.executor is None:
+                # spawn, because fetch threads are running when the pool starts
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self.executor
+
+    def extract(self, spool):
+        reader = PyPDF2.PdfReader(spool)
+        page_count = len(reader.pages)
+        if page_count < PARALLEL_MIN_PAGES or self.max_workers < 2:
+            pages = [page.extract_text() or "" for page in reader.pages]
+            return " ".join(pages).strip(), page_count
+
+        spool.seek(0)
+        with tempfile.NamedTemporaryFile(suffix='.pdf') as f:
+            shutil.copyfileobj(spool, f)
+            f.flush()
+            step = -(-page_count // self.max_workers)
+            futures = [
+                self.pool().submit(extract_range, f.name, start, min(start + step, page_count))
+                for start in range(0, page_count, step)
+            ]
+            pages = [text for future in futures for text in future.result()]
+        return " ".join(pages).strip(), page_count
+
+    def close(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
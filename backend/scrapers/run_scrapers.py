@@ -0,0 +1,34 @@
+from concurrent.futures import ThreadPoolExecutor
+from http_pool import FetchPool
+from boc_scraper import BoCScraper
+from fed_scraper import FedScraper
+
+# Runs every bank's scraper in one process, sharing a single fetch pool.
+# Each scraper keeps its own DB connection; per-host limits keep the pool polite.
+SCRAPERS = [BoCScraper, FedScraper]
+
+
+def run_scraper(scraper_cls, fetch_pool):
+    scraper = scraper_cls(fetch_pool=fetch_pool)
+    try:
+        scraper.run()
+    finally:
+        scraper.close()
+
+
+def run_all():
+    fetch_pool = FetchPool()
+    try:
+        with ThreadPoolExecutor(max_workers=len(SCRAPERS)) as executor:
+            futures = [executor.submit(run_scraper, cls, fetch_pool) for cls in SCRAPERS]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Scraper failed: {e}")
+    finally:
+        fetch_pool.close()
+
+
+if __name__ == "__main__":
+    run_all()
@@ -0,0 +1,121 @@
+# Full-text search over scored sentences and transcript bodies.
+#
+# Both tables carry a stored, generated search_vector column (see schema.py)
+# with a GIN index on it. Storing the tsvector rather than indexing the
+# expression means ranking reads it instead of re-parsing every matching row.
+# Results are paged with keysets on (rank, id) or (publish_date, id), so deep
+# pages cost the same as the first one.
+
+from datetime import datetime
+
+SEARCH_CONFIG = 'english'
+# What the search_vector columns are generated from
+SENTENCE_VECTOR = f"to_tsvector('{SEARCH_CONFIG}', coalesce(sentence_text, ''))"
+TRANSCRIPT_VECTOR = f"to_tsvector('{SEARCH_CONFIG}', coalesce(content, ''))"
+QUERY = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+
+# Only the rows on the returned page pay for ts_headline
+HEADLINE_OPTIONS = 'MaxFragments=2, MinWords=10, MaxWords=30, FragmentDelimiter=" ... "'
+
+
+def parse_search_cursor(cursor, sort):
+    """Cursors are '<rank>_<id>' (sort=rank) or '<publish_date>_<id>' (sort=date) of the last row."""
+    raw_key, raw_id = cursor.rsplit('_', 1)
+    if sort == 'rank':
+        return float(raw_key), int(raw_id)
+    return datetime.strptime(raw_key, '%Y-%m-%d').date(), int(raw_id)
+
+
+def search_cursor(key, row_id, sort):
+    if sort == 'rank':
+        return f"{key!r}_{row_id}"
+    return f"{key.strftime('%Y-%m-%d')}_{row_id}"
+
+
+def transcript_filters(vector, q=None, bank=None, start=None, end=None):
+    """WHERE clauses shared by both searches; transcripts are aliased as t."""
+    where, params = [], []
+    if q:
+        where.append(f"{vector} @@ {QUERY}")
+        params.append(q)
+    if bank:
+        where.append("LOWER(t.bank_name) = LOWER(%s)")
+        params.append(bank)
+    if start:
+        where.append("t.publish_date >= %s")
+        params.append(start)
+    if end:
+        where.append("t.publish_date <= %s")
+        params.append(end)
+    return where, params
+
+
+def ranked(select, source, vector, q, where, params, sort, cursor, limit, normalization=0):
+    """
+    Adds rank / sort_key columns to a SELECT list and wraps it in keyset
+    paging, fetching one extra row to tell whether there is a next page.
+    Without q there is nothing to rank by, so results come newest first.
+    """
+    if q:
+        rank = f"ts_rank_cd({vector}, {QUERY}, {normalization})::float8"
+        rank_params = [q]
+    else:
+        rank, rank_params = "NULL::float8", []
+    sort_key = rank if sort == 'rank' else "t.publish_date"
+
+    outer_where, outer_params = "", []
+    if cursor:
+        outer_where = "WHERE (sort_key, id) < (%s, %s)"
+        outer_params = list(parse_search_cursor(cursor, sort))
+
+    query = f"""
+        SELECT * FROM (
+            SELECT {select}, {rank} AS rank, {sort_key} AS sort_key
+            {source}
+            {"WHERE " + " AND ".join(where) if where else ""}
+        ) hits
+        {outer_where}
+        ORDER BY sort_key DESC, id DESC
+        LIMIT %s
+    """
+    sort_params = rank_params if sort == 'rank' else []
+    return query, rank_params + sort_params + params + outer_params + [limit + 1]
+
+
+def sentence_query(q=None, bank=None, topic=None, min_score=None, max_score=None,
+                   start=None, end=None, sort='rank', cursor=None, limit=50):
+    where, params = transcript_filters("s.search_vector", q, bank, start, end)
+    # Matches the (topic, stance_score) index, so topic + score range is one index range scan
+    if topic:
+        where.append("s.topic = %s")
+        params.append(topic)
+    if min_score is not None:
+        where.append("s.stance_score >= %s")
+        params.append(min_score)
+    if max_score is not None:
+        where.append("s.stance_score <= %s")
+        params.append(max_score)
+
+    select = """
+        s.id, s.transcript_id, t.bank_name AS bank, t.publish_date AS date,
+        s.sentence_text, s.topic, s.stance_score, s.impact_weight
+    """
+    source = "FROM transcript_sentences s JOIN transcripts t ON t.id = s.transcript_id"
+    return ranked(select, source, "s.search_vector", q, where, params, sort, cursor, limit)
+
+
+def transcript_query(q=None, bank=None, start=None, end=None, sort='rank', cursor=None, limit=50):
+    where, params = transcript_filters("t.search_vector", q, bank, start, end)
+    select = "t.id, t.bank_name AS bank, t.publish_date AS date, t.url"
+    # Normalization 1 divides by 1 + log(length), so long statements don't outrank short ones on length alone
+    page, page_params = ranked(select, "FROM transcripts t", "t.search_vector", q, where, params,
+                               sort, cursor, limit, normalization=1)
+    if not q:
+        return page, page_params
+
+    return f"""
+        SELECT page.*, ts_headline('{SEARCH_CONFIG}', t.content, {QUERY}, '{HEADLINE_OPTIONS}') AS snippet
+        FROM ({page}) page
+        JOIN transcripts t ON t.id = page.id
+        ORDER BY page.sort_key DESC, page.id DESC
+    """, [q] + page_params
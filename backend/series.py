@@ -0,0 +1,197 @@
+import orjson
+import numpy as np
+import pandas as pd
+
+# Column spellings the banks have been stored under
+BANK_COLUMNS = {'fed': ('Fed', 'fed'), 'boc': ('BoC', 'boc')}
+
+LN2 = np.log(2.0)
+
+
+class SentimentMatrix:
+    """
+    Per-bank release arrays built once from daily_sentiment and reused for
+    every weighting mode. Each bank holds the day offsets of its releases
+    (relative to the first release of either bank) and the plain mean,
+    impact-weighted mean and sentence count published on each of them.
+    """
+
+    def __init__(self, df):
+        self.banks = {}
+        if df.empty:
+            self.start = None
+            self.days = np.array([], dtype='datetime64[D]')
+            return
+
+        dates = pd.to_datetime(df['date']).to_numpy().astype('datetime64[D]')
+        self.start = dates.min()
+        self.days = np.arange(self.start, dates.max() + np.timedelta64(1, 'D'))
+
+        offsets = (dates - self.start).astype(np.int64)
+        bank_names = df['bank_name'].to_numpy()
+        for key, names in BANK_COLUMNS.items():
+            mask = np.isin(bank_names, names)
+            order = np.argsort(offsets[mask], kind='stable')
+            self.banks[key] = {
+                'offsets': offsets[mask][order],
+                'plain': df['sentiment'].to_numpy(dtype=float)[mask][order],
+                'impact': df['weighted_sentiment'].to_numpy(dtype=float)[mask][order],
+                'count': df['sentence_count'].to_numpy(dtype=float)[mask][order],
+            }
+
+    def ffill(self, offsets, values):
+        """Most recent release on or before each day, 0 before the first one (NaN releases are skipped)."""
+        valid = ~np.isnan(values)
+        offsets, values = offsets[valid], values[valid]
+        day_offsets = np.arange(len(self.days))
+        idx = np.searchsorted(offsets, day_offsets, side='right') - 1
+        return np.where(idx >= 0, values[np.maximum(idx, 0)], 0.0)
+
+    def decay(self, offsets, values, counts, half_life):
+        """
+        Exponentially time-decayed mean of all releases up to each day,
+        weighted by sentence count. Numerator and denominator decay by the
+        same factor each day, so the mean only moves on release days: the
+        recurrence steps once per release (decaying over the whole gap) and
+        the result is forward-filled, O(days + releases) rather than a
+        days x releases weight matrix. Carrying the mean rather than the
+        numerator means a long gap underflows to "latest release only", not 0/0.
+        """
+        valid = ~np.isnan(values)
+        offsets, values, counts = offsets[valid], values[valid], counts[valid]
+        if len(offsets) == 0:
+            return np.zeros(len(self.days))
+
+        weights = np.maximum(counts, 1.0)
+        retained = np.exp(-np.diff(offsets, prepend=offsets[0]) * LN2 / half_life)
+        means = []
+        mean = den = 0.0
+        for keep, value, weight in zip(retained.tolist(), values.tolist(), weights.tolist()):
+            carried = den * keep
+            den = carried + weight
+            mean = (mean * carried + value * weight) / den
+            means.append(mean)
+        return self.ffill(offsets, np.array(means))
+
+    def bank_series(self, key, mode, half_life):
+        bank = self.banks.get(key)
+        if bank is None or len(bank['offsets']) == 0:
+            return np.zeros(len(self.days))
+        if mode == 'impact':
+            return self.ffill(bank['offsets'], bank['impact'])
+        if mode == 'decay':
+            return self.decay(bank['offsets'], bank['plain'], bank['count'], half_life)
+        return self.ffill(bank['offsets'], bank['plain'])
+
+    def divergence(self, mode='plain', half_life=30.0, freq='daily'):
+        """Returns (days, fed, boc, divergence) arrays for the requested weighting and frequency."""
+        days = self.days
+        fed = self.bank_series('fed', mode, half_life)
+        boc = self.bank_series('boc', mode, half_life)
+
+        if freq == 'weekly' and len(days):
+            # 1970-01-01 was a Thursday, so (day + 3) // 7 numbers Monday-based weeks
+            week = (days.astype(np.int64) + 3) // 7
+            last = np.append(np.flatnonzero(np.diff(week)), len(days) - 1)
+            days, fed, boc = days[last], fed[last], boc[last]
+
+        return days, fed, boc, fed - boc
+
+
+def min_max(values):
+    """Min-max normalization to [0, 1], ignoring NaN; a flat series maps to 0."""
+    if len(values) == 0 or np.isnan(values).all():
+        return values.copy()
+    low, high = np.nanmin(values), np.nanmax(values)
+    return (values - low) / (high - low) if high > low else np.where(np.isnan(values), np.nan, 0.0)
+
+
+def align_prices(days, price_days, prices):
+    """Last price on or before each day (NaN before the first bar), plus its min-max normalization over the window."""
+    if len(price_days) == 0 or len(days) == 0:
+        nan = np.full(len(days), np.nan)
+        return nan, nan.copy()
+
+    idx = np.searchsorted(price_days, days, side='right') - 1
+    aligned = np.where(idx >= 0, prices[np.maximum(idx, 0)], np.nan)
+    if np.isnan(aligned).all():
+        return aligned, aligned.copy()
+    return np.round(aligned, 4), np.round(min_max(aligned), 4)
+
+
+def slice_range(days, start=None, end=None):
+    """Index bounds [lo, hi) of the days within [start, end], by binary search over the sorted axis."""
+    lo = int(np.searchsorted(days, np.datetime64(start, 'D'), side='left')) if start else 0
+    hi = int(np.searchsorted(days, np.datetime64(end, 'D'), side='right')) if end else len(days)
+    return lo, max(lo, hi)
+
+
+def lttb(values, max_points):
+    """
+    Largest-Triangle-Three-Buckets: indices of max_points samples that keep
+    the drawn shape of `values`. The first and last points are kept, and each
+    bucket in between keeps the point forming the largest triangle with the
+    previous pick and the next bucket's average, so peaks and reversals
+    survive while flat stretches thin out. The x axis is the sample index.
+    """
+    n = len(values)
+    if not max_points or n <= max_points:
+        return np.arange(n)
+    if max_points < 3:
+        return np.array([0, n - 1][:max_points])
+
+    y = np.asarray(values, dtype=float)
+    if np.isnan(y).any():
+        y = np.where(np.isnan(y), np.nanmean(y) if not np.isnan(y).all() else 0.0, y)
+
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    keep = np.empty(max_points, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = (edges[i + 1] + edges[i + 2] - 1) / 2, y[edges[i + 1]:edges[i + 2]].mean()
+        else:
+            next_x, next_y = n - 1, y[n - 1]
+        xs = np.arange(lo, hi)
+        area = np.abs((a - next_x) * (y[lo:hi] - y[a]) - (a - xs) * (next_y - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def window(days, columns, start=None, end=None, max_points=None, shape_by=None):
+    """
+    Slices aligned arrays to [start, end] and, past max_points, downsamples
+    them together with LTTB on the `shape_by` column.
+    """
+    lo, hi = slice_range(days, start, end)
+    days = days[lo:hi]
+    columns = {k: np.asarray(v)[lo:hi] for k, v in columns.items()}
+    if max_points and len(days) > max_points:
+        idx = lttb(columns[shape_by], max_points)
+        days = days[idx]
+        columns = {k: v[idx] for k, v in columns.items()}
+    return days, columns
+
+
+def to_records(days, **columns):
+    """Aligned arrays as the list-of-dicts shape the chart endpoints return by default."""
+    keys = ['date', *columns]
+    dates = np.datetime_as_string(days, unit='D').tolist()
+    rows = zip(dates, *(np.asarray(c).tolist() for c in columns.values()))
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def encode_series(days, fmt='records', **columns):
+    """
+    Serializes aligned arrays straight to JSON bytes with orjson. 'columnar'
+    emits one array per field ({"date": [...], "fed": [...]}) instead of
+    repeating every key on every row.
+    """
+    if fmt == 'columnar':
+        payload = {'date': np.datetime_as_string(days, unit='D').tolist()}
+        payload.update({k: np.ascontiguousarray(v, dtype=float) for k, v in columns.items()})
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return orjson.dumps(to_records(days, **columns))
@@ -0,0 +1,180 @@
+import os
+import time
+import random
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Per-request stage timings. The dict is created by the middleware and shared
+# by reference, so stages recorded inside asyncio.to_thread workers (which copy
+# the context) still land on the request that started them.
+_current = contextvars.ContextVar('request_timings', default=None)
+
+# Histogram buckets in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", 500))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/finsent-profiles")
+
+
+def record(name, seconds):
+    timings = _current.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.total += 1
+        self.sum += seconds
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = {}  # (route, method, status) -> count
+        self.durations = {}  # (route, stage) -> Histogram
+
+    def observe(self, route, method, status, timings):
+        with self.lock:
+            key = (route, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            for name, seconds in timings.items():
+                self.durations.setdefault((route, name), Histogram()).observe(seconds)
+
+    def render(self, gauges=None):
+        """Prometheus text exposition format."""
+        lines = [
+            "# HELP finsent_requests_total HTTP requests by route, method and status.",
+            "# TYPE finsent_requests_total counter",
+        ]
+        with self.lock:
+            for (route, method, status), count in sorted(self.requests.items()):
+                lines.append(f'finsent_requests_total{{route="{route}",method="{method}",status="{status}"}} {count}')
+
+            lines += [
+                "# HELP finsent_stage_seconds Time spent per request stage.",
+                "# TYPE finsent_stage_seconds histogram",
+            ]
+            for (route, name), hist in sorted(self.durations.items()):
+                labels = f'route="{route}",stage="{name}"'
+                for bound, count in zip(BUCKETS, hist.counts):
+                    lines.append(f'finsent_stage_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'finsent_stage_seconds_bucket{{{labels},le="+Inf"}} {hist.total}')
+                lines.append(f'finsent_stage_seconds_sum{{{labels}}} {hist.sum:.6f}')
+                lines.append(f'finsent_stage_seconds_count{{{labels}}} {hist.total}')
+
+        for name, (help_text, value) in (gauges or {}).items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+class SampledProfiler:
+    """
+    Opt-in (PROFILE_SAMPLE_RATE > 0): profiles a random sample of requests,
+    one at a time, and keeps the report only if the request took longer than
+    PROFILE_SLOW_MS. Uses pyinstrument when installed since it follows
+    awaits, otherwise cProfile.
+    """
+
+    def __init__(self):
+        self.busy = threading.Lock()
+
+    def start(self):
+        if PROFILE_SAMPLE_RATE <= 0 or random.random() >= PROFILE_SAMPLE_RATE:
+            return None
+        if not self.busy.acquire(blocking=False):
+            return None
+        try:
+            from pyinstrument import Profiler
+            profiler = Profiler(async_mode='enabled')
+            profiler.start()
+        except ImportError:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        return profiler
+
+    def stop(self, profiler, route, elapsed):
+        try:
+            if hasattr(profiler, 'output_text'):
+                profiler.stop()
+            else:
+                profiler.disable()
+            if elapsed * 1000 < PROFILE_SLOW_MS:
+                return
+
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            name = route.strip('/').replace('/', '_').replace('{', '').replace('}', '') or 'root'
+            path = os.path.join(PROFILE_DIR, f"{int(time.time() * 1000)}_{name}")
+            if hasattr(profiler, 'output_text'):
+                with open(path + ".txt", "w") as f:
+                    f.write(profiler.output_text())
+            else:
+                profiler.dump_stats(path + ".prof")
+            print(f"Slow request {route} took {elapsed * 1000:.0f} ms, profile saved to {path}")
+        finally:
+            self.busy.release()
+
+
+class TimingMiddleware:
+    """
+    ASGI middleware that times each request, adds a Server-Timing header
+    with every recorded stage, and feeds the /metrics registry.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.profiler = SampledProfiler()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        timings = {}
+        token = _current.set(timings)
+        start = time.perf_counter()
+        status = {'code': 500}
+        profiler = self.profiler.start()
+
+        async def send_with_timing(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+                timings['total'] = time.perf_counter() - start
+                header = ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items())
+                message.setdefault('headers', [])
+                message['headers'] = list(message['headers']) + [(b'server-timing', header.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - start
+            timings['total'] = elapsed
+            route = getattr(scope.get('route'), 'path', None) or 'unmatched'
+            metrics.observe(route, scope.get('method', ''), status['code'], timings)
+            if profiler is not None:
+                self.profiler.stop(profiler, route, elapsed)
+            _current.reset(token)
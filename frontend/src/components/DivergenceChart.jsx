@@ -1,7 +1,7 @@
 import React, { useEffect, useState, useMemo, Suspense, useRef } from 'react';
 import {
   LineChart, Line, BarChart, Bar, Cell, XAxis, YAxis, CartesianGrid,
-  Tooltip, Legend, ResponsiveContainer, ReferenceLine
+  Tooltip, Legend, ResponsiveContainer, ReferenceLine, ReferenceArea
 } from 'recharts';
 import { Canvas, useFrame } from '@react-three/fiber';
 import { OrbitControls, useGLTF } from '@react-three/drei';
@@ -79,11 +79,32 @@ const Model3DWrapper = () => {
   );
 };
 
+// More points than the chart has pixels only costs bandwidth
+const CHART_MAX_POINTS = 1000;
+
+// Background shading per detected divergence regime, matching the bar colours
+const REGIME_COLORS = {
+  fed_more_hawkish: '#10b981',
+  boc_more_hawkish: '#f43f5e',
+  aligned: '#8d8d8d'
+};
+
+// First day (YYYY-MM-DD) of a time range button, or null for all history
+const rangeStart = (range) => {
+  if (range === 'all') return null;
+  const cutoff = new Date();
+  if (range === '90d') cutoff.setDate(cutoff.getDate() - 90);
+  if (range === '1y') cutoff.setFullYear(cutoff.getFullYear() - 1);
+  if (range === '3y') cutoff.setFullYear(cutoff.getFullYear() - 3);
+  return cutoff.toISOString().slice(0, 10);
+};
+
 const DivergenceChart = () => {
   const [data, setData] = useState([]);
-  const [usdcadData, setUsdcadData] = useState([]);
   const [loading, setLoading] = useState(true);
   const [timeRange, setTimeRange] = useState('all');
+  const [analytics, setAnalytics] = useState(null);
+  const [regimes, setRegimes] = useState([]);
   const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://127.0.0.1:8000';
 
   const CustomTooltip = ({ active, payload, label }) => {
@@ -134,85 +155,74 @@ const DivergenceChart = () => {
   };
 
   useEffect(() => {
-    const fetchSentiment = fetch(`${API_BASE_URL}/api/divergence`).then(res => res.json());
-    const fetchUSDCAD = fetch(`${API_BASE_URL}/api/usdcad`).then(res => res.json());
-
-    Promise.all([fetchSentiment, fetchUSDCAD])
-      .then(([sentimentData, fxData]) => {
-        const fedKeys = ['fed', 'federal reserve', 'us federal reserve', 'u.s. federal reserve', 'u.s. reserve', 'federal_reserve'];
-        const bocKeys = ['boc', 'bank of canada', 'bank_of_canada', 'bankofcanada'];
-
-        const mapped = (sentimentData || []).map(row => {
-          let fedVal = 0, bocVal = 0;
-          for (const k of fedKeys) if (row[k] !== undefined) { fedVal = Number(row[k]); break; }
-          for (const k of bocKeys) if (row[k] !== undefined) { bocVal = Number(row[k]); break; }
-          return {
-            date: row.date,
-            fed: Number(fedVal.toFixed(2)),
-            boc: Number(bocVal.toFixed(2)),
-            divergence: Number((fedVal - bocVal).toFixed(2))
-          };
-        }).filter(r => r.date);
+    // Divergence and USD/CAD arrive already aligned on one date axis, cut to
+    // the selected range and downsampled server-side
+    const params = new URLSearchParams({ max_points: CHART_MAX_POINTS });
+    const cutoff = rangeStart(timeRange);
+    if (cutoff) params.set('start', cutoff);
+    fetch(`${API_BASE_URL}/api/dashboard?${params}`)
+      .then(res => res.json())
+      .then(rows => {
+        const mapped = (rows || []).map(row => ({
+          date: row.date,
+          fed: Number(Number(row.fed || 0).toFixed(2)),
+          boc: Number(Number(row.boc || 0).toFixed(2)),
+          divergence: Number(Number(row.divergence || 0).toFixed(2)),
+          usdcad_price: row.price
+        })).filter(r => r.date);
 
         setData(mapped);
-        setUsdcadData(fxData);
+        setLoading(false);
+      })
+      .catch(err => {
+        console.error('Failed to fetch dashboard:', err);
         setLoading(false);
       });
-  }, []);
+  }, [timeRange]);
 
-  const filteredData = useMemo(() => {
-    if (timeRange === 'all') return data;
-    const cutoff = new Date();
-    if (timeRange === '90d') cutoff.setDate(cutoff.getDate() - 90);
-    if (timeRange === '1y') cutoff.setFullYear(cutoff.getFullYear() - 1);
-    if (timeRange === '3y') cutoff.setFullYear(cutoff.getFullYear() - 3);
-    return data.filter(d => new Date(d.date) >= cutoff);
-  }, [data, timeRange]);
-
-  const filteredUSDCAD = useMemo(() => {
-    if (timeRange === 'all') return usdcadData;
-    const cutoff = new Date();
-    if (timeRange === '90d') cutoff.setDate(cutoff.getDate() - 90);
-    if (timeRange === '1y') cutoff.setFullYear(cutoff.getFullYear() - 1);
-    if (timeRange === '3y') cutoff.setFullYear(cutoff.getFullYear() - 3);
-    return usdcadData.filter(d => new Date(d.date) >= cutoff);
-  }, [usdcadData, timeRange]);
-
-  const mergedData = useMemo(() => {
-    const fxSorted = [...filteredUSDCAD].sort((a, b) => new Date(a.date) - new Date(b.date));
-    let lastFX = null, fxIdx = 0;
-    return filteredData.map(d => {
-      while (fxIdx < fxSorted.length && new Date(fxSorted[fxIdx].date) <= new Date(d.date)) {
-        lastFX = fxSorted[fxIdx].price;
-        fxIdx++;
-      }
-      return { ...d, usdcad_price: lastFX };
-    });
-  }, [filteredData, filteredUSDCAD]);
+  const mergedData = data;
+
+  useEffect(() => {
+    // Summary stats and the lead/lag scan are computed server-side per time range
+    fetch(`${API_BASE_URL}/api/analytics?range=${timeRange}`)
+      .then(res => res.json())
+      .then(setAnalytics)
+      .catch(err => console.error('Failed to fetch analytics:', err));
+  }, [timeRange]);
+
+  useEffect(() => {
+    // Regimes are detected offline; the chart only shades what the pipeline stored
+    const params = new URLSearchParams({ series: 'divergence' });
+    const cutoff = rangeStart(timeRange);
+    if (cutoff) params.set('start', cutoff);
+    fetch(`${API_BASE_URL}/api/regimes?${params}`)
+      .then(res => res.json())
+      .then(body => setRegimes(body.divergence || []))
+      .catch(err => console.error('Failed to fetch regimes:', err));
+  }, [timeRange]);
+
+  const regimeAreas = useMemo(() => {
+    // The x axis is categorical, so each band is snapped to the first / last plotted date inside it
+    if (!data.length) return [];
+    return regimes.map(regime => {
+      const inside = data.filter(d => d.date >= regime.start && d.date <= regime.end);
+      if (!inside.length) return null;
+      return { ...regime, x1: inside[0].date, x2: inside[inside.length - 1].date };
+    }).filter(Boolean);
+  }, [data, regimes]);
 
   const stats = useMemo(() => {
-    if (filteredData.length === 0) return { current: 0, avg: 0, volatility: 0, forwardCorrelation: 0, lagDays: 1 };
-    const current = filteredData[filteredData.length - 1]?.divergence || 0;
-    const avg = filteredData.reduce((sum, d) => sum + d.divergence, 0) / filteredData.length;
-    const volatility = Math.sqrt(filteredData.reduce((sum, d) => sum + Math.pow(d.divergence - avg, 2), 0) / filteredData.length);
-
-    const lagDays = 1;
-    let forwardCorrelation = 0;
-    if (mergedData.length > lagDays + 10) {
-      const divs = [], fxPrices = [];
-      for (let i = 0; i < mergedData.length - lagDays; i++) {
-        const d = mergedData[i], fx = mergedData[i + lagDays];
-        if (d.divergence != null && fx.usdcad_price != null) { divs.push(d.divergence); fxPrices.push(fx.usdcad_price); }
-      }
-      if (divs.length > 10) {
-        const mDiv = divs.reduce((a, b) => a + b, 0) / divs.length, mPrice = fxPrices.reduce((a, b) => a + b, 0) / fxPrices.length;
-        const num = divs.reduce((s, div, i) => s + (div - mDiv) * (fxPrices[i] - mPrice), 0);
-        const d1 = Math.sqrt(divs.reduce((s, v) => s + Math.pow(v - mDiv, 2), 0)), d2 = Math.sqrt(fxPrices.reduce((s, v) => s + Math.pow(v - mPrice, 2), 0));
-        forwardCorrelation = num / (d1 * d2);
-      }
-    }
-    return { current, avg, volatility, forwardCorrelation, lagDays };
-  }, [filteredData, mergedData]);
+    const summary = analytics?.summary;
+    if (!summary) return { current: 0, avg: 0, volatility: 0, forwardCorrelation: 0, lagDays: 0 };
+    const best = summary.best_lag;
+    return {
+      current: summary.current,
+      avg: summary.mean,
+      volatility: summary.volatility,
+      forwardCorrelation: best ? best.correlation : 0,
+      lagDays: best ? best.lag : 0
+    };
+  }, [analytics]);
 
   if (loading) return <div className="p-20 text-center animate-pulse tracking-widest text-slate-500 font-mono text-xl uppercase">INIT_SYSTEM_SEQ...</div>;
 
@@ -301,7 +311,7 @@ const DivergenceChart = () => {
             val: stats.forwardCorrelation,
             color: 'text-yellow-400',
             glow: '',
-            tooltip: `Correlation between policy divergence and USD/CAD price ${stats.lagDays} day later. Measures predictive relationship between central bank sentiment and currency movement.`
+            tooltip: `Strongest correlation between policy divergence and USD/CAD daily returns, found ${stats.lagDays} days later in a 0-60 day lag scan. Measures predictive relationship between central bank sentiment and currency movement.`
           }
         ].map((s, i) => (
           <div key={i} className="relative border border-slate-900 p-6 bg-gradient-to-br from-[#0d0d0d] to-[#1a1a1a] hover:border-slate-700 hover:card-glow hover:scale-[1.02] transition-all duration-300 group">
@@ -375,7 +385,7 @@ const DivergenceChart = () => {
           </div>
           <div className="h-[500px] w-full">
             <ResponsiveContainer>
-              <BarChart data={filteredData}>
+              <BarChart data={mergedData}>
                 <CartesianGrid strokeDasharray="2 2" stroke="#444" vertical={false} strokeWidth={1} />
                 <XAxis 
                   dataKey="date"
@@ -389,10 +399,20 @@ const DivergenceChart = () => {
                   }}
                 />
                 <YAxis domain={[-1, 1]} stroke="#8d8d8d" tick={{fontSize: 16, fontWeight: 700, fill: '#8d8d8d'}} />
+                {regimeAreas.map(area => (
+                  <ReferenceArea
+                    key={area.start}
+                    x1={area.x1}
+                    x2={area.x2}
+                    fill={REGIME_COLORS[area.label] || REGIME_COLORS.aligned}
+                    fillOpacity={0.08}
+                    ifOverflow="hidden"
+                  />
+                ))}
                 <Tooltip content={<DivergenceTooltip />} />
                 <ReferenceLine y={0} stroke="#a7a7a7" strokeWidth={1} />
                 <Bar dataKey="divergence">
-                  {filteredData.map((e, i) => (
+                  {mergedData.map((e, i) => (
                     <Cell key={i} fill={e.divergence > 0 ? '#10b981' : '#f43f5e'} opacity={0.9} />
                   ))}
                 </Bar>
@@ -2,6 +2,9 @@ import { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
 import HelpModal from './HelpModal';
 
+// Cards whose sentences are fetched alongside the one being expanded
+const SENTENCE_PREFETCH = 5;
+
 const TranscriptsPage = () => {
   const [transcripts, setTranscripts] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -10,11 +13,25 @@ const TranscriptsPage = () => {
   const [sentences, setSentences] = useState({});
   const [loadingSentences, setLoadingSentences] = useState({});
   const [showHelp, setShowHelp] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://127.0.0.1:8000';
 
+  const fetchPage = (cursor) => {
+    const params = new URLSearchParams();
+    if (filterBank === 'fed') params.set('bank', 'Fed');
+    if (filterBank === 'boc') params.set('bank', 'BoC');
+    if (cursor) params.set('cursor', cursor);
+
+    return fetch(`${API_BASE_URL}/api/transcripts?${params}`)
+      .then(res => {
+        setNextCursor(res.headers.get('X-Next-Cursor'));
+        return res.json();
+      });
+  };
+
   useEffect(() => {
-    fetch(`${API_BASE_URL}/api/transcripts`)
-      .then(res => res.json())
+    fetchPage(null)
       .then(data => {
         setTranscripts(data);
         setLoading(false);
@@ -23,7 +40,21 @@ const TranscriptsPage = () => {
         console.error('Failed to fetch transcripts:', err);
         setLoading(false);
       });
-  }, []);
+  }, [filterBank]);
+
+  const handleLoadMore = () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    fetchPage(nextCursor)
+      .then(data => {
+        setTranscripts(prev => [...prev, ...data]);
+        setLoadingMore(false);
+      })
+      .catch(err => {
+        console.error('Failed to fetch transcripts:', err);
+        setLoadingMore(false);
+      });
+  };
 
   const handleTranscriptClick = (transcriptId) => {
     if (expandedId === transcriptId) {
@@ -33,19 +64,33 @@ const TranscriptsPage = () => {
 
     setExpandedId(transcriptId);
 
-    if (!sentences[transcriptId]) {
-      setLoadingSentences(prev => ({ ...prev, [transcriptId]: true }));
-      fetch(`${API_BASE_URL}/api/transcripts/${transcriptId}/sentences`)
-        .then(res => res.json())
-        .then(data => {
-          setSentences(prev => ({ ...prev, [transcriptId]: data }));
-          setLoadingSentences(prev => ({ ...prev, [transcriptId]: false }));
-        })
-        .catch(err => {
-          console.error('Failed to fetch sentences:', err);
-          setLoadingSentences(prev => ({ ...prev, [transcriptId]: false }));
-        });
-    }
+    if (sentences[transcriptId] || loadingSentences[transcriptId]) return;
+
+    // Fetch the clicked card together with the next few below it, so scrolling on costs no extra round trips
+    const index = filteredTranscripts.findIndex(t => t.id === transcriptId);
+    const ids = [transcriptId, ...filteredTranscripts
+      .slice(index + 1)
+      .map(t => t.id)
+      .filter(id => !sentences[id] && !loadingSentences[id])
+      .slice(0, SENTENCE_PREFETCH)];
+    const params = new URLSearchParams();
+    ids.forEach(id => params.append('ids', id));
+    const markLoading = (value) => setLoadingSentences(prev => ({
+      ...prev,
+      ...Object.fromEntries(ids.map(id => [id, value]))
+    }));
+
+    markLoading(true);
+    fetch(`${API_BASE_URL}/api/sentences?${params}`)
+      .then(res => res.json())
+      .then(data => {
+        setSentences(prev => ({ ...prev, ...data }));
+        markLoading(false);
+      })
+      .catch(err => {
+        console.error('Failed to fetch sentences:', err);
+        markLoading(false);
+      });
   };
 
   const filteredTranscripts = transcripts.filter(t => {
@@ -273,6 +318,18 @@ const TranscriptsPage = () => {
           )}
         </div>
 
+        {nextCursor && (
+          <div className="mt-10 text-center">
+            <button
+              onClick={handleLoadMore}
+              disabled={loadingMore}
+              className="px-6 py-2 text-xs font-bold border border-slate-700 text-slate-400 hover:border-slate-500 hover:text-slate-200 transition-all duration-300 uppercase"
+            >
+              {loadingMore ? 'Loading...' : 'Load More'}
+            </button>
+          </div>
+        )}
+
         <footer className="mt-24 pt-10 border-t-2 border-slate-700 text-xs text-slate-400">
           <div className="space-y-3">
             <p className="uppercase tracking-widest font-bold">Data Sources</p>